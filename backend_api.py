@@ -597,9 +597,8 @@ async def apply_ai_actions(request: ApplyActionsRequest):
                         "after_context": action_item.get("after_context"),
                         "description": action_item.get("description", f"Contextual {operation}"),
                     }
-                    valid, err_msg = ContextualDiffProcessor.validate_contextual_changes(modified_in_memory_content, [contextual_change_op])
+                    valid, err_msg, modified_in_memory_content = ContextualDiffProcessor.apply_with_validation(modified_in_memory_content, [contextual_change_op])
                     if not valid: raise ValueError(f"Invalid contextual change: {err_msg}")
-                    modified_in_memory_content = ContextualDiffProcessor.apply_contextual_changes(modified_in_memory_content, [contextual_change_op])
                     results.append({"type": action_type, "path_info": file_path, "status": "success", "operation": operation, "detail": action_description})
 
                 elif action_type == "EDIT_FILE_CONTEXTUAL_BATCH":
@@ -609,9 +608,8 @@ async def apply_ai_actions(request: ApplyActionsRequest):
                         if not chg.get("operation"): raise ValueError(f"Change {idx+1} in batch for {file_path} missing 'operation'")
                         if "description" not in chg: chg["description"] = f"Batch item {idx+1}: {chg.get('operation')}"
                     
-                    valid, err_msg = ContextualDiffProcessor.validate_contextual_changes(modified_in_memory_content, batch_changes)
+                    valid, err_msg, modified_in_memory_content = ContextualDiffProcessor.apply_with_validation(modified_in_memory_content, batch_changes)
                     if not valid: raise ValueError(f"Invalid contextual batch changes: {err_msg}")
-                    modified_in_memory_content = ContextualDiffProcessor.apply_contextual_changes(modified_in_memory_content, batch_changes)
                     results.append({"type": action_type, "path_info": file_path, "status": "success", "detail": action_description, "changes_applied": len(batch_changes)})
                 
             except Exception as e_action:
@@ -792,7 +790,10 @@ async def git_current_branch():
 
 @app.post("/git/pull", response_model=CommandOutput)
 async def git_pull():
-    return run_git_command(["git", "pull"], current_project_path)
+    result = run_git_command(["git", "pull"], current_project_path)
+    # Pulled changes bypass write_file_content, so drop the cached context here
+    utils.invalidate_rag_cache(current_project_path)
+    return result
 
 
 if __name__ == "__main__":
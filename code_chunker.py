@@ -0,0 +1,1037 @@
+# code_chunker.py - Code analysis and chunking for the RAG index
+#
+# Kept free of the embedding, FAISS and graph imports, so the worker
+# processes that chunk files in parallel start without loading them.
+import ast
+import functools
+import hashlib
+import os
+import re
+from bisect import bisect_right
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+# Patterns used by CodeAnalyzer.analyze_code, compiled once at import
+_RE_ES6_IMPORT = re.compile(r'import\s*\{([^}]+)\}\s*from\s*[\'"]([^\'"]+)[\'"]')
+_RE_DEFAULT_IMPORT = re.compile(r'import\s+(\w+)\s+from\s*[\'"]([^\'"]+)[\'"]')
+_RE_NAMESPACE_IMPORT = re.compile(
+    r'import\s*\*\s*as\s+(\w+)\s+from\s*[\'"]([^\'"]+)[\'"]'
+)
+_RE_JSX_COMPONENT = re.compile(r"<([A-Z]\w+)")
+_RE_CLASS_COMPONENT = re.compile(r"class\s+(\w+)\s+extends\s+(?:React\.)?Component")
+_RE_FUNC_COMPONENT = re.compile(r"(?:function|const)\s+([A-Z]\w+)\s*(?:=|\()")
+_RE_CUSTOM_ELEMENT = re.compile(r"<([a-z]+-[a-z]+)")
+_RE_CLASSNAME_ATTR = re.compile(r'className\s*=\s*[\'"]([^\'"]+)[\'"]')
+_RE_CLASS_ATTR = re.compile(r'class\s*=\s*[\'"]([^\'"]+)[\'"]')
+_RE_ID_ATTR = re.compile(r'id\s*=\s*[\'"]([^\'"]+)[\'"]')
+# File extension to language, for CodeAnalyzer.detect_language
+_LANGUAGE_MAP = {
+    ".py": "python",
+    ".js": "javascript",
+    ".ts": "typescript",
+    ".jsx": "javascript",
+    ".tsx": "typescript",
+    ".go": "golang",
+    ".java": "java",
+    ".cpp": "cpp",
+    ".c": "c",
+    ".h": "c",
+    ".hpp": "cpp",
+    ".rs": "rust",
+    ".php": "php",
+    ".rb": "ruby",
+    ".json": "json",
+    ".yaml": "yaml",
+    ".yml": "yaml",
+    ".xml": "xml",
+    ".html": "html",
+    ".htm": "html",
+    ".css": "css",
+    ".scss": "css",
+    ".sass": "css",
+    ".less": "css",
+    ".sql": "sql",
+    ".md": "markdown",
+    ".txt": "text",
+}
+
+
+# Languages whose sources can hold markup with class and id attributes
+_MARKUP_LANGUAGES = {"javascript", "typescript", "html", "php", "xml"}
+_RE_GENERIC_FUNCTION = re.compile(r"(?:function|def|func)\s+(\w+)", re.IGNORECASE)
+_RE_GENERIC_CLASS = re.compile(r"class\s+(\w+)", re.IGNORECASE)
+_RE_GENERIC_IMPORT = re.compile(
+    r'(?:import|include|require)\s+[\'"]*([^\s\'"]+)', re.IGNORECASE
+)
+_RE_CSS_CLASS = re.compile(r"\.([a-zA-Z_-][\w-]*)")
+_RE_CSS_ID = re.compile(r"#([a-zA-Z_-][\w-]*)")
+_RE_CSS_MIXIN = re.compile(r"@mixin\s+([a-zA-Z_-][\w-]*)")
+_RE_CSS_FUNCTION = re.compile(r"@function\s+([a-zA-Z_-][\w-]*)")
+_RE_CSS_IMPORT = re.compile(r'@import\s+[\'"]([^\'"]+)[\'"]')
+_RE_CSS_IMPORT_URL = re.compile(r'@import\s+url\([\'"]?([^\'"]+)[\'"]?\)')
+
+# Patterns used by the per-language element extractors
+_RE_CLASS_NAME = re.compile(r"class\s+(\w+)")
+_RE_PY_DEF = re.compile(r"def\s+(\w+)")
+_RE_PY_IMPORT = re.compile(r"import\s+(\w+)")
+_RE_PY_FROM = re.compile(r"from\s+(\w+)")
+_RE_JS_FUNCTION = re.compile(r"function\s+(\w+)")
+_RE_JS_CONST_FUNCTION = re.compile(r"const\s+(\w+)\s*=\s*(?:async\s+)?\(")
+_RE_JS_PROPERTY_FUNCTION = re.compile(r"(\w+)\s*:\s*(?:async\s+)?function")
+_RE_JS_ARROW_FUNCTION = re.compile(r"(\w+)\s*=\s*(?:async\s+)?\(.*?\)\s*=>")
+_RE_JS_EXPORTED_FUNCTION = re.compile(r"export\s+(?:async\s+)?function\s+(\w+)")
+_RE_JS_EXPORTED_CLASS = re.compile(r"export\s+class\s+(\w+)")
+_RE_JS_IMPORT_FROM = re.compile(r'import.*from\s+[\'"]([^\'"]+)[\'"]')
+_RE_JS_REQUIRE = re.compile(r'require\([\'"]([^\'"]+)[\'"]\)')
+_RE_JS_BARE_IMPORT = re.compile(r'import\s+[\'"]([^\'"]+)[\'"]')
+_RE_GO_FUNC = re.compile(r"func\s+(\w+)")
+_RE_GO_METHOD = re.compile(r"func\s+\(\w+\s+\*?\w+\)\s+(\w+)")
+_RE_GO_STRUCT = re.compile(r"type\s+(\w+)\s+struct")
+_RE_GO_INTERFACE = re.compile(r"type\s+(\w+)\s+interface")
+_RE_GO_IMPORT = re.compile(r'import\s+"([^"]+)"')
+_RE_GO_IMPORT_BLOCK = re.compile(r'import\s+\(\s*"([^"]+)"')
+_RE_GO_QUOTED_LINE_END = re.compile(r'"([^"]+)"\s*$', re.MULTILINE)
+_RE_HTML_CUSTOM_ELEMENT = re.compile(r"<(\w+-\w+)")
+_RE_HTML_SCRIPT_SRC = re.compile(r'<script.*?src\s*=\s*[\'"]([^\'"]+)[\'"]')
+_RE_HTML_LINK_HREF = re.compile(r'<link.*?href\s*=\s*[\'"]([^\'"]+)[\'"]')
+
+
+# Patterns CodeChunker uses to find chunk boundaries. The boundary patterns
+# are matched over a whole file, so their whitespace must not cross lines
+_RE_JS_BLOCK_START = re.compile(
+    r"^[^\S\n]*(?:export[^\S\n]+)?(?:async[^\S\n]+)?"
+    r"(?:function|const[^\S\n]+\w+[^\S\n]*=|class|interface)",
+    re.MULTILINE,
+)
+_RE_GO_BOUNDARY = re.compile(
+    r"^[^\S\n]*(?:func[^\S\n]+|type[^\S\n]+\w+[^\S\n]+(?:struct|interface))",
+    re.MULTILINE,
+)
+_RE_HTML_SECTION_START = re.compile(
+    r"<(head|body|header|nav|main|section|article|aside|footer"
+    r"|div[^\S\n]+(?:class|id))"
+    r"|<script"
+    r"|<style",
+    re.IGNORECASE,
+)
+_RE_HTML_TAG = re.compile(r"<(\w+)")
+_RE_HTML_MAJOR_SECTION = re.compile(
+    r"<(?:head|body|header|nav|main|section|article|aside|footer)", re.IGNORECASE
+)
+_RE_CSS_RULE_START = re.compile(
+    r"^[^\S\n]*(?:[.#]?[\w-]+(?:[^\S\n]*[,.:]|[^\S\n]*\{)|@)", re.MULTILINE
+)
+
+# Keywords counted towards complexity_score, per language
+_COMPLEXITY_KEYWORDS = {
+    "python": ["if", "elif", "else", "for", "while", "try", "except", "with"],
+    "javascript": ["if", "else", "for", "while", "try", "catch", "switch", "case"],
+    "typescript": ["if", "else", "for", "while", "try", "catch", "switch", "case"],
+    "golang": ["if", "else", "for", "switch", "case", "defer", "go"],
+    "html": ["script", "style", "form", "table"],
+    "css": ["@media", "@keyframes", "@supports", "hover", "active"],
+}
+_DEFAULT_COMPLEXITY_KEYWORDS = ["if", "else", "for", "while", "try", "catch"]
+
+
+def _keyword_pattern(keywords: List[str]) -> "re.Pattern[str]":
+    # Whole-word keywords never overlap, so one alternation counts them all
+    return re.compile(
+        rf"\b(?:{'|'.join(re.escape(keyword) for keyword in keywords)})\b",
+        re.IGNORECASE,
+    )
+
+
+_COMPLEXITY_PATTERNS = {
+    language: _keyword_pattern(keywords)
+    for language, keywords in _COMPLEXITY_KEYWORDS.items()
+}
+_DEFAULT_COMPLEXITY_PATTERN = _keyword_pattern(_DEFAULT_COMPLEXITY_KEYWORDS)
+
+
+@functools.lru_cache(maxsize=256)
+def _parse_python(content: str) -> Optional[ast.Module]:
+    """Parse Python source once per distinct content; None on a syntax error
+
+    The chunker parses a whole file and then every chunk cut from it, so a
+    file that ends up as a single chunk, or content re-indexed unchanged,
+    is parsed once. Callers must treat the returned tree as read-only.
+    """
+    try:
+        return ast.parse(content)
+    except SyntaxError:
+        return None
+
+
+def _line_starts(content: str) -> List[int]:
+    """Offsets of the lines of ``content.split("\\n")``, plus one past the end"""
+    starts = [0]
+    pos = content.find("\n")
+    while pos != -1:
+        starts.append(pos + 1)
+        pos = content.find("\n", pos + 1)
+    starts.append(len(content) + 1)
+    return starts
+
+
+def _join_lines(content: str, starts: List[int], first: int, last: int) -> str:
+    """``"\\n".join(lines[first:last])`` sliced straight out of ``content``"""
+    line_count = len(starts) - 1
+    first = min(first, line_count)
+    last = min(last, line_count)
+    if first >= last:
+        return ""
+    return content[starts[first] : starts[last] - 1]
+
+
+def _match_lines(
+    pattern: "re.Pattern[str]", content: str, starts: List[int]
+) -> List[int]:
+    """Lines ``pattern`` matches on, in order, from a single scan of ``content``
+
+    The pattern must not match across a line break.
+    """
+    matched: List[int] = []
+    for match in pattern.finditer(content):
+        line = bisect_right(starts, match.start()) - 1
+        if not matched or matched[-1] != line:
+            matched.append(line)
+    return matched
+
+
+def _find_brace_block_end(
+    content: str, starts: List[int], start_line: int, require_open: bool = True
+) -> int:
+    """Line whose ``}`` brings the brace count from ``start_line`` back to zero
+
+    Hops from brace to brace with ``str.find`` over the whole file instead
+    of walking every character of every line. With ``require_open`` a
+    closing brace only ends the block once an opening one has been seen.
+    Falls back to the last line when the block never closes.
+    """
+    line_count = len(starts) - 1
+    if start_line >= line_count:
+        return line_count - 1
+
+    brace_count = 0
+    in_block = not require_open
+    pos = starts[start_line]
+    next_open = content.find("{", pos)
+    next_close = content.find("}", pos)
+    while next_close != -1:
+        if next_open != -1 and next_open < next_close:
+            brace_count += 1
+            in_block = True
+            next_open = content.find("{", next_open + 1)
+        else:
+            brace_count -= 1
+            if in_block and brace_count == 0:
+                return bisect_right(starts, next_close) - 1
+            next_close = content.find("}", next_close + 1)
+
+    return line_count - 1
+
+
+class CodeAnalyzer:
+    """Enhanced code analyzer with dependency extraction"""
+
+    @staticmethod
+    def extract_javascript_imports(content: str) -> Dict[str, List[str]]:
+        """Extract JavaScript/TypeScript imports with their sources"""
+        imports = {}
+
+        # ES6 imports
+        # import { x, y } from 'module'
+        es6_imports = _RE_ES6_IMPORT.findall(content)
+        for symbols, source in es6_imports:
+            symbol_list = [s.strip() for s in symbols.split(",")]
+            imports[source] = symbol_list
+
+        # import x from 'module'
+        default_imports = _RE_DEFAULT_IMPORT.findall(content)
+        for symbol, source in default_imports:
+            if source in imports:
+                imports[source].append(symbol)
+            else:
+                imports[source] = [symbol]
+
+        # import * as x from 'module'
+        namespace_imports = _RE_NAMESPACE_IMPORT.findall(content)
+        for symbol, source in namespace_imports:
+            if source in imports:
+                imports[source].append(f"* as {symbol}")
+            else:
+                imports[source] = [f"* as {symbol}"]
+
+        return imports
+
+    @staticmethod
+    def extract_ui_components(content: str, language: str) -> List[str]:
+        """Extract UI component references"""
+        components = []
+
+        if language in ["javascript", "typescript"]:
+            # JSX components
+            jsx_components = _RE_JSX_COMPONENT.findall(content)
+            components.extend(jsx_components)
+
+            # React class components
+            class_components = _RE_CLASS_COMPONENT.findall(content)
+            components.extend(class_components)
+
+            # Function components (heuristic: PascalCase functions returning JSX)
+            func_components = _RE_FUNC_COMPONENT.findall(content)
+            components.extend(func_components)
+
+        elif language == "html":
+            # Custom elements
+            custom_elements = _RE_CUSTOM_ELEMENT.findall(content)
+            components.extend(custom_elements)
+
+        return list(set(components))  # Remove duplicates
+
+    @classmethod
+    def analyze_code(cls, content: str, file_path: str) -> Dict[str, Any]:
+        """Enhanced code analysis with dependency information"""
+        language = cls.detect_language(file_path)
+        base_analysis = cls._analyze_code_impl(content, language)
+
+        # Add enhanced analysis
+        if language in ["javascript", "typescript"]:
+            base_analysis["imported_from"] = cls.extract_javascript_imports(content)
+
+        base_analysis["ui_components"] = cls.extract_ui_components(content, language)
+
+        # Extract CSS classes and IDs for style dependencies, which only
+        # markup (HTML, JSX and templates) can carry
+        css_classes = []
+        dom_ids = []
+        if language in _MARKUP_LANGUAGES:
+            css_classes = _RE_CLASSNAME_ATTR.findall(content)
+            css_classes.extend(_RE_CLASS_ATTR.findall(content))
+            dom_ids = _RE_ID_ATTR.findall(content)
+        base_analysis["css_classes"] = list(set(css_classes))
+        base_analysis["dom_ids"] = list(set(dom_ids))
+
+        return base_analysis
+
+    @classmethod
+    def analyze_code_original(cls, content: str, file_path: str) -> Dict[str, Any]:
+        """Original analyze_code method renamed"""
+        return cls._analyze_code_impl(content, cls.detect_language(file_path))
+
+    @classmethod
+    def _analyze_code_impl(cls, content: str, language: str) -> Dict[str, Any]:
+        """Functions, classes, imports and complexity of already detected code"""
+        # Original implementation from your code
+        if language == "python":
+            functions, classes, imports = cls.extract_python_elements(content)
+        elif language in ["javascript", "typescript"]:
+            functions, classes, imports = cls.extract_javascript_elements(content)
+        elif language == "golang":
+            functions, classes, imports = cls.extract_golang_elements(content)
+        elif language == "html":
+            functions, classes, imports = cls.extract_html_elements(content)
+        elif language == "css":
+            functions, classes, imports = cls.extract_css_elements(content)
+        else:
+            # Generic extraction for other languages
+            functions = _RE_GENERIC_FUNCTION.findall(content)
+            classes = _RE_GENERIC_CLASS.findall(content)
+            imports = _RE_GENERIC_IMPORT.findall(content)
+
+        # Calculate complexity (language-specific keywords)
+        complexity_pattern = _COMPLEXITY_PATTERNS.get(
+            language, _DEFAULT_COMPLEXITY_PATTERN
+        )
+        complexity_score = len(complexity_pattern.findall(content))
+
+        return {
+            "language": language,
+            "functions": functions,
+            "classes": classes,
+            "imports": imports,
+            "complexity_score": float(complexity_score),
+        }
+
+    # Keep all the original extract_* methods from your implementation
+    @staticmethod
+    @functools.lru_cache(maxsize=4096)
+    def detect_language(file_path: str) -> str:
+        """Detect programming language from file extension"""
+        ext = os.path.splitext(file_path)[1].lower()
+        return _LANGUAGE_MAP.get(ext, "unknown")
+
+    @staticmethod
+    def extract_python_elements(content: str) -> Tuple[List[str], List[str], List[str]]:
+        """Extract functions, classes, and imports from Python code"""
+        functions = []
+        classes = []
+        imports = []
+
+        tree = _parse_python(content)
+        if tree is not None:
+            for node in ast.walk(tree):
+                if isinstance(node, ast.FunctionDef):
+                    functions.append(node.name)
+                elif isinstance(node, ast.ClassDef):
+                    classes.append(node.name)
+                elif isinstance(node, ast.Import):
+                    for alias in node.names:
+                        imports.append(alias.name)
+                elif isinstance(node, ast.ImportFrom):
+                    if node.module:
+                        imports.append(node.module)
+        else:
+            # If parsing fails, use regex fallback
+            functions.extend(_RE_PY_DEF.findall(content))
+            classes.extend(_RE_CLASS_NAME.findall(content))
+            imports.extend(_RE_PY_IMPORT.findall(content))
+            imports.extend(_RE_PY_FROM.findall(content))
+
+        return functions, classes, imports
+
+    @staticmethod
+    def extract_javascript_elements(
+        content: str,
+    ) -> Tuple[List[str], List[str], List[str]]:
+        """Extract functions, classes, and imports from JavaScript/TypeScript"""
+        functions = []
+        classes = []
+        imports = []
+
+        # Function patterns
+        functions.extend(_RE_JS_FUNCTION.findall(content))
+        functions.extend(_RE_JS_CONST_FUNCTION.findall(content))
+        functions.extend(_RE_JS_PROPERTY_FUNCTION.findall(content))
+        functions.extend(_RE_JS_ARROW_FUNCTION.findall(content))
+        functions.extend(_RE_JS_EXPORTED_FUNCTION.findall(content))
+
+        # Class patterns
+        classes.extend(_RE_CLASS_NAME.findall(content))
+        classes.extend(_RE_JS_EXPORTED_CLASS.findall(content))
+
+        # Import patterns
+        imports.extend(_RE_JS_IMPORT_FROM.findall(content))
+        imports.extend(_RE_JS_REQUIRE.findall(content))
+        imports.extend(_RE_JS_BARE_IMPORT.findall(content))
+
+        return functions, classes, imports
+
+    @staticmethod
+    def extract_golang_elements(content: str) -> Tuple[List[str], List[str], List[str]]:
+        """Extract functions, structs, and imports from Go code"""
+        functions = []
+        classes = []  # Structs in Go
+        imports = []
+
+        # Function patterns
+        functions.extend(_RE_GO_FUNC.findall(content))
+        functions.extend(_RE_GO_METHOD.findall(content))  # Methods
+
+        # Struct patterns (classes equivalent in Go)
+        classes.extend(_RE_GO_STRUCT.findall(content))
+        classes.extend(_RE_GO_INTERFACE.findall(content))
+
+        # Import patterns
+        imports.extend(_RE_GO_IMPORT.findall(content))
+        imports.extend(_RE_GO_IMPORT_BLOCK.findall(content))
+        imports.extend(_RE_GO_QUOTED_LINE_END.findall(content))
+
+        return functions, classes, imports
+
+    @staticmethod
+    def extract_html_elements(content: str) -> Tuple[List[str], List[str], List[str]]:
+        """Extract components, IDs, and classes from HTML"""
+        functions = []  # Custom elements/components
+        classes = []  # CSS classes
+        imports = []  # Scripts and stylesheets
+
+        # Custom elements and components
+        functions.extend(_RE_HTML_CUSTOM_ELEMENT.findall(content))  # Custom elements
+        functions.extend(_RE_JSX_COMPONENT.findall(content))  # React components
+
+        # CSS classes
+        classes.extend(_RE_CLASS_ATTR.findall(content))
+
+        # Scripts and stylesheets
+        imports.extend(_RE_HTML_SCRIPT_SRC.findall(content))
+        imports.extend(_RE_HTML_LINK_HREF.findall(content))
+
+        return functions, classes, imports
+
+    @staticmethod
+    def extract_css_elements(content: str) -> Tuple[List[str], List[str], List[str]]:
+        """Extract selectors, classes, and imports from CSS"""
+        functions = []  # Mixins, functions
+        classes = []  # CSS classes and IDs
+        imports = []  # @import statements
+
+        # CSS classes and IDs
+        classes.extend(_RE_CSS_CLASS.findall(content))
+        classes.extend(_RE_CSS_ID.findall(content))
+
+        # CSS functions and mixins (SCSS/SASS)
+        functions.extend(_RE_CSS_MIXIN.findall(content))
+        functions.extend(_RE_CSS_FUNCTION.findall(content))
+
+        # Imports
+        imports.extend(_RE_CSS_IMPORT.findall(content))
+        imports.extend(_RE_CSS_IMPORT_URL.findall(content))
+
+        return functions, classes, imports
+
+
+class CodeChunker:
+    """Enhanced chunker with UI-aware chunking"""
+
+    def __init__(self, max_chunk_size: int = 2000):
+        self.max_chunk_size = max_chunk_size
+
+    def _create_chunk(
+        self,
+        content: str,
+        file_path: str,
+        start_line: int,
+        end_line: int,
+        chunk_type: str,
+    ) -> Dict[str, Any]:
+        """Enhanced chunk creation with dependency information"""
+        analysis = CodeAnalyzer.analyze_code(content, file_path)
+
+        # Generate description
+        description = self._generate_description(
+            content, file_path, chunk_type, analysis
+        )
+
+        # Create unique chunk ID
+        chunk_id = hashlib.blake2b(
+            f"{file_path}:{start_line}:{end_line}:{content[:100]}".encode(),
+            digest_size=16,
+        ).hexdigest()
+
+        return {
+            "content": content,
+            "file_path": file_path,
+            "chunk_id": chunk_id,
+            "start_line": start_line,
+            "end_line": end_line,
+            "chunk_type": chunk_type,
+            "description": description,
+            "imported_from": analysis.get("imported_from", {}),
+            "ui_components": analysis.get("ui_components", []),
+            "css_classes": analysis.get("css_classes", []),
+            "dom_ids": analysis.get("dom_ids", []),
+            **analysis,
+        }
+
+    # Keep all the original chunking methods from your implementation
+    def chunk_by_functions(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+        """Chunk code by functions and classes"""
+        language = CodeAnalyzer.detect_language(file_path)
+
+        if language == "python":
+            return self._chunk_python(content, file_path)
+        elif language in ["javascript", "typescript"]:
+            return self._chunk_javascript(content, file_path)
+        elif language == "golang":
+            return self._chunk_golang(content, file_path)
+        elif language == "html":
+            return self._chunk_html(content, file_path)
+        elif language == "css":
+            return self._chunk_css(content, file_path)
+        else:
+            return self._chunk_generic(content, file_path)
+
+    def _chunk_python(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+        """Chunk Python code by functions and classes"""
+        chunks = []
+        lines = content.split("\n")
+        starts = _line_starts(content)
+
+        tree = _parse_python(content)
+        if tree is not None:
+            # Get all function and class definitions with their line numbers,
+            # without descending into function bodies: closures stay in their
+            # enclosing function's chunk, while methods still get their own
+            nodes = []
+            pending = [tree]
+            while pending:
+                node = pending.pop()
+                if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    pending.extend(ast.iter_child_nodes(node))
+                if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
+                    nodes.append(
+                        {
+                            "node": node,
+                            "start": node.lineno - 1,
+                            "type": (
+                                "function"
+                                if isinstance(node, ast.FunctionDef)
+                                else "class"
+                            ),
+                            "name": node.name,
+                        }
+                    )
+
+            # Sort by line number
+            nodes.sort(key=lambda x: x["start"])
+
+            # Create chunks
+            last_end = 0
+            for i, node_info in enumerate(nodes):
+                start_line = node_info["start"]
+
+                # Add module-level code before this function/class
+                if start_line > last_end:
+                    module_content = _join_lines(content, starts, last_end, start_line)
+                    if module_content.strip():
+                        chunks.append(
+                            self._create_chunk(
+                                content=module_content,
+                                file_path=file_path,
+                                start_line=last_end,
+                                end_line=start_line - 1,
+                                chunk_type="module",
+                            )
+                        )
+
+                # Find end of this function/class
+                end_line = self._find_python_block_end(lines, start_line)
+
+                # Create chunk for this function/class
+                chunk_content = _join_lines(content, starts, start_line, end_line + 1)
+                chunks.append(
+                    self._create_chunk(
+                        content=chunk_content,
+                        file_path=file_path,
+                        start_line=start_line,
+                        end_line=end_line,
+                        chunk_type=node_info["type"],
+                    )
+                )
+
+                last_end = end_line + 1
+
+            # Add remaining module-level code
+            if last_end < len(lines):
+                module_content = _join_lines(content, starts, last_end, len(lines))
+                if module_content.strip():
+                    chunks.append(
+                        self._create_chunk(
+                            content=module_content,
+                            file_path=file_path,
+                            start_line=last_end,
+                            end_line=len(lines) - 1,
+                            chunk_type="module",
+                        )
+                    )
+
+        else:
+            # Fallback to generic chunking
+            chunks = self._chunk_generic(content, file_path)
+
+        return chunks
+
+    def _find_python_block_end(self, lines: List[str], start_line: int) -> int:
+        """Find the end of a Python function or class block"""
+        if start_line >= len(lines):
+            return len(lines) - 1
+
+        # Get initial indentation
+        start_indent = len(lines[start_line]) - len(lines[start_line].lstrip())
+
+        for i in range(start_line + 1, len(lines)):
+            line = lines[i]
+            stripped = line.lstrip()
+            if stripped:  # Non-empty line
+                current_indent = len(line) - len(stripped)
+                if current_indent <= start_indent:
+                    return i - 1
+
+        return len(lines) - 1
+
+    def _chunk_javascript(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+        """Chunk JavaScript/TypeScript code"""
+        chunks = []
+        starts = _line_starts(content)
+        line_count = len(starts) - 1
+
+        # Find function boundaries in a single scan over the file
+        function_starts = _match_lines(_RE_JS_BLOCK_START, content, starts)
+
+        last_end = 0
+        for start in function_starts:
+            # Add code before this function
+            if start > last_end:
+                module_content = _join_lines(content, starts, last_end, start)
+                if module_content.strip():
+                    chunks.append(
+                        self._create_chunk(
+                            content=module_content,
+                            file_path=file_path,
+                            start_line=last_end,
+                            end_line=start - 1,
+                            chunk_type="module",
+                        )
+                    )
+
+            # Find end of function (simple b
+            # Find end of function (simple brace counting)
+            end = self._find_js_block_end(content, starts, start)
+            chunk_content = _join_lines(content, starts, start, end + 1)
+
+            # Determine chunk type
+            chunk_type = "function"
+            start_line_content = _join_lines(content, starts, start, start + 1)
+            if "class" in start_line_content or "interface" in start_line_content:
+                chunk_type = "class"
+
+            chunks.append(
+                self._create_chunk(
+                    content=chunk_content,
+                    file_path=file_path,
+                    start_line=start,
+                    end_line=end,
+                    chunk_type=chunk_type,
+                )
+            )
+
+            last_end = end + 1
+
+        # Add remaining code
+        if last_end < line_count:
+            module_content = _join_lines(content, starts, last_end, line_count)
+            if module_content.strip():
+                chunks.append(
+                    self._create_chunk(
+                        content=module_content,
+                        file_path=file_path,
+                        start_line=last_end,
+                        end_line=line_count - 1,
+                        chunk_type="module",
+                    )
+                )
+
+        return chunks if chunks else self._chunk_generic(content, file_path)
+
+    def _find_js_block_end(
+        self, content: str, starts: List[int], start_line: int
+    ) -> int:
+        """Find end of JavaScript block using brace counting"""
+        return _find_brace_block_end(content, starts, start_line)
+
+    def _chunk_golang(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+        """Chunk Go code by functions and structs"""
+        chunks = []
+        starts = _line_starts(content)
+        line_count = len(starts) - 1
+
+        # Find function and struct boundaries
+        boundaries = _match_lines(_RE_GO_BOUNDARY, content, starts)
+
+        last_end = 0
+        for start in boundaries:
+            # Add code before this function/struct
+            if start > last_end:
+                module_content = _join_lines(content, starts, last_end, start)
+                if module_content.strip():
+                    chunks.append(
+                        self._create_chunk(
+                            content=module_content,
+                            file_path=file_path,
+                            start_line=last_end,
+                            end_line=start - 1,
+                            chunk_type="module",
+                        )
+                    )
+
+            # Find end of function/struct
+            end = self._find_go_block_end(content, starts, start)
+            chunk_content = _join_lines(content, starts, start, end + 1)
+
+            # Determine chunk type
+            chunk_type = "function"
+            start_line_content = _join_lines(content, starts, start, start + 1)
+            if "type" in start_line_content and (
+                "struct" in start_line_content or "interface" in start_line_content
+            ):
+                chunk_type = "type"
+
+            chunks.append(
+                self._create_chunk(
+                    content=chunk_content,
+                    file_path=file_path,
+                    start_line=start,
+                    end_line=end,
+                    chunk_type=chunk_type,
+                )
+            )
+
+            last_end = end + 1
+
+        # Add remaining code
+        if last_end < line_count:
+            module_content = _join_lines(content, starts, last_end, line_count)
+            if module_content.strip():
+                chunks.append(
+                    self._create_chunk(
+                        content=module_content,
+                        file_path=file_path,
+                        start_line=last_end,
+                        end_line=line_count - 1,
+                        chunk_type="module",
+                    )
+                )
+
+        return chunks if chunks else self._chunk_generic(content, file_path)
+
+    def _find_go_block_end(
+        self, content: str, starts: List[int], start_line: int
+    ) -> int:
+        """Find end of Go function or struct block"""
+        return _find_brace_block_end(content, starts, start_line)
+
+    def _chunk_html(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+        """Chunk HTML by components and sections"""
+        chunks = []
+        starts = _line_starts(content)
+        line_count = len(starts) - 1
+
+        # Find major HTML sections
+        boundaries = _match_lines(_RE_HTML_SECTION_START, content, starts)
+
+        # If no major sections found, chunk by size
+        if not boundaries:
+            return self._chunk_generic(content, file_path)
+
+        last_end = 0
+        for start in boundaries:
+            if start > last_end:
+                # Add content before this section
+                section_content = _join_lines(content, starts, last_end, start)
+                if section_content.strip():
+                    chunks.append(
+                        self._create_chunk(
+                            content=section_content,
+                            file_path=file_path,
+                            start_line=last_end,
+                            end_line=start - 1,
+                            chunk_type="html_section",
+                        )
+                    )
+
+            # Find end of this section
+            end = self._find_html_section_end(content, starts, start)
+            chunk_content = _join_lines(content, starts, start, end + 1)
+
+            chunks.append(
+                self._create_chunk(
+                    content=chunk_content,
+                    file_path=file_path,
+                    start_line=start,
+                    end_line=end,
+                    chunk_type="html_section",
+                )
+            )
+
+            last_end = end + 1
+
+        # Add remaining content
+        if last_end < line_count:
+            remaining_content = _join_lines(content, starts, last_end, line_count)
+            if remaining_content.strip():
+                chunks.append(
+                    self._create_chunk(
+                        content=remaining_content,
+                        file_path=file_path,
+                        start_line=last_end,
+                        end_line=line_count - 1,
+                        chunk_type="html_section",
+                    )
+                )
+
+        return chunks
+
+    def _find_html_section_end(
+        self, content: str, starts: List[int], start_line: int
+    ) -> int:
+        """Find end of HTML section"""
+        line_count = len(starts) - 1
+        # Simple approach: look for closing tag or next major section
+        next_line = starts[start_line + 1] if start_line + 1 < line_count else -1
+
+        # Extract tag name
+        tag_match = _RE_HTML_TAG.search(
+            content, starts[start_line], starts[start_line + 1] - 1
+        )
+        if tag_match and next_line != -1:
+            tag_name = tag_match.group(1)
+            closing_tag = f"</{tag_name}>"
+
+            closing = content.find(closing_tag, next_line)
+            if closing != -1:
+                return bisect_right(starts, closing) - 1
+
+        # Fallback: next 20 lines or next major section
+        if next_line != -1:
+            window_end = starts[min(start_line + 21, line_count)] - 1
+            section = _RE_HTML_MAJOR_SECTION.search(content, next_line, window_end)
+            if section:
+                return bisect_right(starts, section.start()) - 2
+
+        return min(start_line + 20, line_count - 1)
+
+    def _chunk_css(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+        """Chunk CSS by selectors and rules"""
+        chunks = []
+        starts = _line_starts(content)
+        line_count = len(starts) - 1
+
+        # Find CSS rules and blocks, looking for selectors and at-rules
+        rule_starts = _match_lines(_RE_CSS_RULE_START, content, starts)
+
+        if not rule_starts:
+            return self._chunk_generic(content, file_path)
+
+        last_end = 0
+        for start in rule_starts:
+            if start > last_end:
+                # Add content before this rule
+                section_content = _join_lines(content, starts, last_end, start)
+                if section_content.strip():
+                    chunks.append(
+                        self._create_chunk(
+                            content=section_content,
+                            file_path=file_path,
+                            start_line=last_end,
+                            end_line=start - 1,
+                            chunk_type="css_block",
+                        )
+                    )
+
+            # Find end of this CSS rule
+            end = self._find_css_rule_end(content, starts, start)
+            chunk_content = _join_lines(content, starts, start, end + 1)
+
+            chunks.append(
+                self._create_chunk(
+                    content=chunk_content,
+                    file_path=file_path,
+                    start_line=start,
+                    end_line=end,
+                    chunk_type="css_rule",
+                )
+            )
+
+            last_end = end + 1
+
+        # Add remaining content
+        if last_end < line_count:
+            remaining_content = _join_lines(content, starts, last_end, line_count)
+            if remaining_content.strip():
+                chunks.append(
+                    self._create_chunk(
+                        content=remaining_content,
+                        file_path=file_path,
+                        start_line=last_end,
+                        end_line=line_count - 1,
+                        chunk_type="css_block",
+                    )
+                )
+
+        return chunks
+
+    def _find_css_rule_end(
+        self, content: str, starts: List[int], start_line: int
+    ) -> int:
+        """Find end of CSS rule"""
+        return _find_brace_block_end(content, starts, start_line, require_open=False)
+
+    def _chunk_generic(self, content: str, file_path: str) -> List[Dict[str, Any]]:
+        """Generic chunking for any file type"""
+        chunks = []
+        starts = _line_starts(content)
+        line_count = len(starts) - 1
+
+        # Simple sliding window approach
+        chunk_size = min(50, line_count)  # 50 lines per chunk
+        overlap = 5  # 5 lines overlap
+
+        for i in range(0, line_count, chunk_size - overlap):
+            end = min(i + chunk_size, line_count)
+            chunk_content = _join_lines(content, starts, i, end)
+
+            if chunk_content.strip():
+                chunks.append(
+                    self._create_chunk(
+                        content=chunk_content,
+                        file_path=file_path,
+                        start_line=i,
+                        end_line=end - 1,
+                        chunk_type="block",
+                    )
+                )
+
+        return chunks
+
+    def _generate_description(
+        self, content: str, file_path: str, chunk_type: str, analysis: Dict[str, Any]
+    ) -> str:
+        """Generate natural language description of code chunk"""
+        descriptions = []
+
+        # File context
+        filename = os.path.basename(file_path)
+        descriptions.append(f"Code from {filename}")
+
+        # Type and functions
+        if chunk_type == "function" and analysis["functions"]:
+            descriptions.append(
+                f"containing function(s): {', '.join(analysis['functions'][:3])}"
+            )
+        elif chunk_type == "class" and analysis["classes"]:
+            descriptions.append(
+                f"containing class(es): {', '.join(analysis['classes'][:3])}"
+            )
+        elif chunk_type == "type" and analysis["classes"]:
+            descriptions.append(
+                f"containing type(s): {', '.join(analysis['classes'][:3])}"
+            )
+        elif chunk_type == "module":
+            descriptions.append("module-level code")
+        elif chunk_type == "html_section":
+            descriptions.append("HTML section")
+        elif chunk_type == "css_rule":
+            descriptions.append("CSS rule")
+
+        # UI components
+        if analysis.get("ui_components"):
+            descriptions.append(
+                f"UI components: {', '.join(analysis['ui_components'][:3])}"
+            )
+
+        # Imports
+        if analysis["imports"]:
+            descriptions.append(f"imports: {', '.join(analysis['imports'][:3])}")
+
+        # Language
+        descriptions.append(f"in {analysis['language']}")
+
+        # Content preview
+        content_preview = content.strip()[:100].replace("\n", " ")
+        if len(content.strip()) > 100:
+            content_preview += "..."
+        descriptions.append(f"Content: {content_preview}")
+
+        return ". ".join(descriptions)
+
+
+def _chunk_file(
+    chunker: CodeChunker, file_path: Path, relative_path: str
+) -> List[Dict[str, Any]]:
+    """Read and chunk a single project file, run in worker processes"""
+    content = file_path.read_text(encoding="utf-8", errors="ignore")
+    if not content.strip():  # Skip empty files
+        return []
+    return chunker.chunk_by_functions(content, relative_path)
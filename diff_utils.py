@@ -1,11 +1,44 @@
 import difflib
+import functools
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from itertools import accumulate
+from operator import itemgetter
 import re
-from typing import List, Dict, Any, Tuple, Optional
+from typing import List, Dict, Any, Tuple, Optional, FrozenSet
 from pathlib import Path
 import logging
 
 logger = logging.getLogger(__name__)
 
+# The same context/target/anchor strings are escaped again for every strategy
+# and every retry, so memoize re.escape.
+_escape = functools.lru_cache(maxsize=1024)(re.escape)
+
+# Results of apply_contextual_changes keyed by (content digest, changes), so an
+# identical retry of the same edit does not redo every search.
+_APPLY_CACHE_MAX_ENTRIES = 32
+_apply_cache: "OrderedDict[Tuple[bytes, str], str]" = OrderedDict()
+_apply_cache_lock = threading.Lock()
+
+
+def _apply_cache_key(content: str, changes: List[Dict[str, Any]]) -> Tuple[bytes, str]:
+    """Builds a compact, content-addressed key for a set of contextual changes."""
+    content_digest = hashlib.blake2b(
+        content.encode("utf-8", "surrogatepass"), digest_size=16
+    ).digest()
+    return content_digest, json.dumps(changes, sort_keys=True, default=str)
+
+
+@functools.lru_cache(maxsize=8)
+def _stripped_lines_text(content: str) -> str:
+    """Returns the stripped lines of content joined and wrapped in newlines for
+    the line-by-line replace fallback. Only content that actually reaches the
+    fallback is normalized, and retries against the same content reuse it."""
+    return "\n" + "\n".join(line.strip() for line in content.splitlines()) + "\n"
+
 
 class PatchOperation:
     """Represents a single patch operation"""
@@ -25,6 +58,14 @@ class PatchOperation:
 
 # diff_utils.py - Enhanced version
 class ContextualDiffProcessor:
+    # Error raised by apply_contextual_changes when an _apply_* helper finds no
+    # match; the helpers return None instead of raising on a miss.
+    _NOT_FOUND_MESSAGES = {
+        "replace": "Could not find target content for replacement: '{term}...'. All strategies failed. Ensure target and context (if provided) exactly match the file.",
+        "insert_before": "Could not find anchor_content for insert_before: '{term}...'. All strategies failed. Ensure anchor and context (if provided) exactly match.",
+        "insert_after": "Could not find anchor_content for insert_after: '{term}...'. All strategies failed. Ensure anchor and context (if provided) exactly match.",
+        "delete": "Could not find target_content for delete: '{term}...'. All strategies failed. Ensure target and context (if provided) exactly match.",
+    }
 
     @staticmethod
     def _normalize_whitespace_for_search(text: str) -> str:
@@ -53,22 +94,89 @@ class ContextualDiffProcessor:
         if before_ctx is not None and after_ctx is not None:
             # Strategy: Full context
             # logger.debug(f"{strategy_name}: Full context pattern")
-            return f"({re.escape(before_ctx)})(\\s*)({term_to_find_escaped})(\\s*)({re.escape(after_ctx)})"
+            return f"({_escape(before_ctx)})(\\s*)({term_to_find_escaped})(\\s*)({_escape(after_ctx)})"
 
         if before_ctx is not None:
             # Strategy: Before context only
             # logger.debug(f"{strategy_name}: Before context pattern")
-            return f"({re.escape(before_ctx)})(\\s*)({term_to_find_escaped})"
+            return f"({_escape(before_ctx)})(\\s*)({term_to_find_escaped})"
 
         if after_ctx is not None:
             # Strategy: After context only
             # logger.debug(f"{strategy_name}: After context pattern")
-            return f"({term_to_find_escaped})(\\s*)({re.escape(after_ctx)})"
+            return f"({term_to_find_escaped})(\\s*)({_escape(after_ctx)})"
 
         # Strategy: Direct term match (no context)
         # logger.debug(f"{strategy_name}: Direct term pattern")
         return f"({term_to_find_escaped})"
 
+    @staticmethod
+    @functools.lru_cache(maxsize=512)
+    def _compile_search_pattern(
+        term_to_find: str,
+        before_ctx: Optional[str],
+        after_ctx: Optional[str],
+    ) -> "re.Pattern[str]":
+        """Compiles the search pattern for a (term, before, after) triple once and
+        memoizes it, so retried strategies and repeated anchors skip re-escaping
+        and re-compiling."""
+        pattern = ContextualDiffProcessor._build_search_pattern(
+            _escape(term_to_find), before_ctx, after_ctx, "Compiled"
+        )
+        return re.compile(pattern, re.DOTALL | re.MULTILINE)
+
+    @staticmethod
+    def _find_exact(
+        content: str,
+        term_to_find: str,
+        before_ctx: Optional[str],
+        after_ctx: Optional[str],
+    ) -> int:
+        """Returns the index of term_to_find where before_ctx + term + after_ctx
+        occurs verbatim in content, or -1. A plain substring search is much
+        cheaper than the regex strategies and covers the common case where the
+        AI reproduced the surrounding text exactly."""
+        before = before_ctx or ""
+        idx = content.find(before + term_to_find + (after_ctx or ""))
+        return idx if idx == -1 else idx + len(before)
+
+    @staticmethod
+    @functools.lru_cache(maxsize=16)
+    def _find_present_terms(
+        content: str, terms: Tuple[Optional[str], ...]
+    ) -> FrozenSet[str]:
+        """Returns the subset of terms that occur in content, located with a single
+        union-regex scan instead of one full scan per term. A term hidden by an
+        overlapping match of another term is not reported, so callers must fall
+        back to a direct search for anything missing from the result.
+        Memoized, since the same content and changes are often validated again
+        (e.g. when a suggestion is previewed and then applied)."""
+        unique_terms = {term for term in terms if isinstance(term, str) and term}
+        if len(unique_terms) < 2:
+            return frozenset(term for term in unique_terms if term in content)
+        union = ContextualDiffProcessor._compile_union_pattern(
+            tuple(sorted(unique_terms, key=lambda term: (-len(term), term)))
+        )
+        return frozenset(match.group() for match in union.finditer(content))
+
+    @staticmethod
+    @functools.lru_cache(maxsize=64)
+    def _compile_union_pattern(terms: Tuple[str, ...]) -> "re.Pattern[str]":
+        """Compiles (and memoizes) an alternation of the escaped terms. Terms are
+        passed longest first so a longer term wins over its own prefix."""
+        return re.compile("|".join(_escape(term) for term in terms))
+
+    @staticmethod
+    def _splice_term(
+        content: str, match: "re.Match[str]", term_group: int, text: str
+    ) -> str:
+        """Replaces the term group of a context-pattern match with text. The
+        surrounding context and whitespace are not part of the slice, so they
+        are kept without rebuilding them from the other groups."""
+        return (
+            content[: match.start(term_group)] + text + content[match.end(term_group) :]
+        )
+
     @staticmethod
     def _find_match_for_validation(
         original_content: str,
@@ -83,45 +191,35 @@ class ContextualDiffProcessor:
         if not term_to_find:  # term_to_find itself cannot be empty
             return False
 
-        term_to_find_escaped = re.escape(term_to_find)
-
         # Try with full context if available
         if before_ctx is not None and after_ctx is not None:
-            pattern = ContextualDiffProcessor._build_search_pattern(
-                term_to_find_escaped, before_ctx, after_ctx, "Validation Full"
+            pattern = ContextualDiffProcessor._compile_search_pattern(
+                term_to_find, before_ctx, after_ctx
             )
-            if pattern and re.search(
-                pattern, original_content, flags=re.DOTALL | re.MULTILINE
-            ):
+            if pattern.search(original_content):
                 return True
 
         # Try with before context if available
         if before_ctx is not None:
-            pattern = ContextualDiffProcessor._build_search_pattern(
-                term_to_find_escaped, before_ctx, None, "Validation Before"
+            pattern = ContextualDiffProcessor._compile_search_pattern(
+                term_to_find, before_ctx, None
             )
-            if pattern and re.search(
-                pattern, original_content, flags=re.DOTALL | re.MULTILINE
-            ):
+            if pattern.search(original_content):
                 return True
 
         # Try with after context if available
         if after_ctx is not None:
-            pattern = ContextualDiffProcessor._build_search_pattern(
-                term_to_find_escaped, None, after_ctx, "Validation After"
+            pattern = ContextualDiffProcessor._compile_search_pattern(
+                term_to_find, None, after_ctx
             )
-            if pattern and re.search(
-                pattern, original_content, flags=re.DOTALL | re.MULTILINE
-            ):
+            if pattern.search(original_content):
                 return True
 
         # Try direct match of the term_to_find
-        pattern = ContextualDiffProcessor._build_search_pattern(
-            term_to_find_escaped, None, None, "Validation Direct"
+        pattern = ContextualDiffProcessor._compile_search_pattern(
+            term_to_find, None, None
         )
-        if pattern and re.search(
-            pattern, original_content, flags=re.DOTALL | re.MULTILINE
-        ):
+        if pattern.search(original_content):
             return True
 
         return False
@@ -165,7 +263,7 @@ class ContextualDiffProcessor:
         }
 
     @staticmethod
-    def _apply_replace(current_content: str, change: Dict[str, Any]) -> str:
+    def _apply_replace(current_content: str, change: Dict[str, Any]) -> Optional[str]:
         target = change.get("target_content", "")
         replacement = change.get("replacement_content", "")
         before_ctx = change.get("before_context")
@@ -176,80 +274,85 @@ class ContextualDiffProcessor:
                 "target_content is required and cannot be empty for replace operation"
             )
 
-        target_escaped = re.escape(target)
-
         # Strategy 1: Full context match
         if before_ctx is not None and after_ctx is not None:
             logger.info("Replace Strategy 1: Full context matching")
-            pattern = ContextualDiffProcessor._build_search_pattern(
-                target_escaped, before_ctx, after_ctx, "ApplyReplace Full"
+            idx = ContextualDiffProcessor._find_exact(
+                current_content, target, before_ctx, after_ctx
             )
-            repl_func = (
-                lambda m: m.group(1)
-                + m.group(2)
-                + replacement
-                + m.group(4)
-                + m.group(5)
-            )
-            new_content, num_subs = re.subn(
-                pattern,
-                repl_func,
-                current_content,
-                count=1,
-                flags=re.DOTALL | re.MULTILINE,
+            if idx != -1:
+                logger.info("✅ Full context exact match successful for replace")
+                return (
+                    current_content[:idx]
+                    + replacement
+                    + current_content[idx + len(target) :]
+                )
+            pattern = ContextualDiffProcessor._compile_search_pattern(
+                target, before_ctx, after_ctx
             )
-            if num_subs > 0:
+            match = pattern.search(current_content)
+            if match:
                 logger.info("✅ Full context match successful for replace")
-                return new_content
+                return ContextualDiffProcessor._splice_term(
+                    current_content, match, 3, replacement
+                )
 
         # Strategy 2: Before context only
         if before_ctx is not None:
             logger.info("Replace Strategy 2: Before context matching")
-            pattern = ContextualDiffProcessor._build_search_pattern(
-                target_escaped, before_ctx, None, "ApplyReplace Before"
-            )
-            repl_func = lambda m: m.group(1) + m.group(2) + replacement
-            new_content, num_subs = re.subn(
-                pattern,
-                repl_func,
-                current_content,
-                count=1,
-                flags=re.DOTALL | re.MULTILINE,
-            )
-            if num_subs > 0:
+            idx = ContextualDiffProcessor._find_exact(
+                current_content, target, before_ctx, None
+            )
+            if idx != -1:
+                logger.info("✅ Before context exact match successful for replace")
+                return (
+                    current_content[:idx]
+                    + replacement
+                    + current_content[idx + len(target) :]
+                )
+            pattern = ContextualDiffProcessor._compile_search_pattern(
+                target, before_ctx, None
+            )
+            match = pattern.search(current_content)
+            if match:
                 logger.info("✅ Before context match successful for replace")
-                return new_content
+                return ContextualDiffProcessor._splice_term(
+                    current_content, match, 3, replacement
+                )
 
         # Strategy 3: After context only
         if after_ctx is not None:
             logger.info("Replace Strategy 3: After context matching")
-            pattern = ContextualDiffProcessor._build_search_pattern(
-                target_escaped, None, after_ctx, "ApplyReplace After"
-            )
-            repl_func = lambda m: replacement + m.group(2) + m.group(3)
-            new_content, num_subs = re.subn(
-                pattern,
-                repl_func,
-                current_content,
-                count=1,
-                flags=re.DOTALL | re.MULTILINE,
-            )
-            if num_subs > 0:
+            idx = ContextualDiffProcessor._find_exact(
+                current_content, target, None, after_ctx
+            )
+            if idx != -1:
+                logger.info("✅ After context exact match successful for replace")
+                return (
+                    current_content[:idx]
+                    + replacement
+                    + current_content[idx + len(target) :]
+                )
+            pattern = ContextualDiffProcessor._compile_search_pattern(
+                target, None, after_ctx
+            )
+            match = pattern.search(current_content)
+            if match:
                 logger.info("✅ After context match successful for replace")
-                return new_content
+                return ContextualDiffProcessor._splice_term(
+                    current_content, match, 1, replacement
+                )
 
         # Strategy 4: Direct target match (no context)
         logger.info("Replace Strategy 4: Direct target matching")
-        pattern = ContextualDiffProcessor._build_search_pattern(
-            target_escaped, None, None, "ApplyReplace Direct"
-        )
-        repl_func = lambda m: replacement
-        new_content, num_subs = re.subn(
-            pattern, repl_func, current_content, count=1, flags=re.DOTALL | re.MULTILINE
-        )
-        if num_subs > 0:
-            logger.info("✅ Direct target match successful for replace")
-            return new_content
+        idx = ContextualDiffProcessor._find_exact(current_content, target, None, None)
+        if idx != -1:
+            logger.info("✅ Direct target exact match successful for replace")
+            return (
+                current_content[:idx]
+                + replacement
+                + current_content[idx + len(target) :]
+            )
 
         # Fallback to line-by-line if regex fails (less precise, from previous implementation)
         logger.warning(
@@ -258,45 +361,38 @@ class ContextualDiffProcessor:
         lines = current_content.splitlines()
         target_lines_list = target.splitlines()
         if not target_lines_list:  # Cannot replace with empty target lines list
-            raise ValueError(
-                f"Cannot perform line-by-line replace: target content '{target[:100]}...' is empty or only whitespace after splitlines."
-            )
-
-        for i in range(len(lines) - len(target_lines_list) + 1):
-            match = True
-            for j, target_line_item in enumerate(target_lines_list):
-                if (
-                    lines[i + j].strip() != target_line_item.strip()
-                ):  # Compare stripped lines
-                    match = False
-                    break
-            if match:
-                # Preserve original line endings of the file as much as possible by splitting replacement by \n
-                # and then joining with the detected line ending or \n as default.
-                # This is a simplified approach. True preservation is complex.
-                replacement_lines_for_join = replacement.splitlines()
-
-                # Reconstruct: original lines before match + replacement lines + original lines after match
-                # This assumes AI provides `replacement` with its own correct internal newlines.
-                # The overall structure is preserved by joining with `\n` which is common.
-                temp_lines_original_split = (
-                    current_content.splitlines()
-                )  # split without keepends for this reconstruction
-                temp_lines_original_split[i : i + len(target_lines_list)] = (
-                    replacement_lines_for_join
-                )
+            return None
+
+        # Normalize each line once and search all of them with a single str.find:
+        # stripped lines never contain a line break, so wrapping both sides in
+        # "\n" only matches whole, consecutive lines.
+        stripped_text = _stripped_lines_text(current_content)
+        stripped_target = (
+            "\n" + "\n".join(line.strip() for line in target_lines_list) + "\n"
+        )
+        # An empty file would join to the same text as a single empty line.
+        match_pos = stripped_text.find(stripped_target) if lines else -1
+        if match_pos != -1:
+            i = stripped_text.count("\n", 0, match_pos)
+            # Preserve original line endings of the file as much as possible by splitting replacement by \n
+            # and then joining with the detected line ending or \n as default.
+            # This is a simplified approach. True preservation is complex.
+            # Reconstruct: original lines before match + replacement lines + original lines after match
+            # This assumes AI provides `replacement` with its own correct internal newlines.
+            # The overall structure is preserved by joining with `\n` which is common.
+            lines[i : i + len(target_lines_list)] = replacement.splitlines()
 
-                logger.info(
-                    "✅ Line-by-line fuzzy match successful for replace (last resort)"
-                )
-                return "\n".join(temp_lines_original_split)
+            logger.info(
+                "✅ Line-by-line fuzzy match successful for replace (last resort)"
+            )
+            return "\n".join(lines)
 
-        raise ValueError(
-            f"Could not find target content for replacement: '{target[:100]}...'. All strategies failed. Ensure target and context (if provided) exactly match the file."
-        )
+        return None
 
     @staticmethod
-    def _apply_insert_before(current_content: str, change: Dict[str, Any]) -> str:
+    def _apply_insert_before(
+        current_content: str, change: Dict[str, Any]
+    ) -> Optional[str]:
         anchor = change.get("anchor_content")
         content_to_insert = change.get("content", "")
         before_ctx = change.get("before_context")
@@ -307,84 +403,68 @@ class ContextualDiffProcessor:
                 "anchor_content is required and cannot be empty for insert_before operation"
             )
 
-        anchor_escaped = re.escape(anchor)
-
         if before_ctx is not None and after_ctx is not None:
             logger.info("Insert_Before Strategy 1: Full context")
-            pattern = ContextualDiffProcessor._build_search_pattern(
-                anchor_escaped, before_ctx, after_ctx, "ApplyInsertBefore Full"
-            )
-            repl_func = (
-                lambda m: m.group(1)
-                + m.group(2)
-                + content_to_insert
-                + m.group(3)
-                + m.group(4)
-                + m.group(5)
+            idx = ContextualDiffProcessor._find_exact(
+                current_content, anchor, before_ctx, after_ctx
             )
-            new_content, num_subs = re.subn(
-                pattern,
-                repl_func,
-                current_content,
-                count=1,
-                flags=re.DOTALL | re.MULTILINE,
+            if idx != -1:
+                return current_content[:idx] + content_to_insert + current_content[idx:]
+
+            pattern = ContextualDiffProcessor._compile_search_pattern(
+                anchor, before_ctx, after_ctx
             )
-            if num_subs > 0:
-                return new_content
+            match = pattern.search(current_content)
+            if match:
+                return ContextualDiffProcessor._splice_term(
+                    current_content, match, 3, content_to_insert + match.group(3)
+                )
 
         if before_ctx is not None:
             logger.info("Insert_Before Strategy 2: Before context")
-            pattern = ContextualDiffProcessor._build_search_pattern(
-                anchor_escaped, before_ctx, None, "ApplyInsertBefore Before"
-            )
-            repl_func = (
-                lambda m: m.group(1) + m.group(2) + content_to_insert + m.group(3)
+            idx = ContextualDiffProcessor._find_exact(
+                current_content, anchor, before_ctx, None
             )
-            new_content, num_subs = re.subn(
-                pattern,
-                repl_func,
-                current_content,
-                count=1,
-                flags=re.DOTALL | re.MULTILINE,
+            if idx != -1:
+                return current_content[:idx] + content_to_insert + current_content[idx:]
+
+            pattern = ContextualDiffProcessor._compile_search_pattern(
+                anchor, before_ctx, None
             )
-            if num_subs > 0:
-                return new_content
+            match = pattern.search(current_content)
+            if match:
+                return ContextualDiffProcessor._splice_term(
+                    current_content, match, 3, content_to_insert + match.group(3)
+                )
 
         if after_ctx is not None:
             logger.info("Insert_Before Strategy 3: After context")
-            pattern = ContextualDiffProcessor._build_search_pattern(
-                anchor_escaped, None, after_ctx, "ApplyInsertBefore After"
-            )
-            repl_func = (
-                lambda m: content_to_insert + m.group(1) + m.group(2) + m.group(3)
+            idx = ContextualDiffProcessor._find_exact(
+                current_content, anchor, None, after_ctx
             )
-            new_content, num_subs = re.subn(
-                pattern,
-                repl_func,
-                current_content,
-                count=1,
-                flags=re.DOTALL | re.MULTILINE,
+            if idx != -1:
+                return current_content[:idx] + content_to_insert + current_content[idx:]
+
+            pattern = ContextualDiffProcessor._compile_search_pattern(
+                anchor, None, after_ctx
             )
-            if num_subs > 0:
-                return new_content
+            match = pattern.search(current_content)
+            if match:
+                return ContextualDiffProcessor._splice_term(
+                    current_content, match, 1, content_to_insert + match.group(1)
+                )
 
         logger.info("Insert_Before Strategy 4: Direct anchor")
-        pattern = ContextualDiffProcessor._build_search_pattern(
-            anchor_escaped, None, None, "ApplyInsertBefore Direct"
-        )
-        repl_func = lambda m: content_to_insert + m.group(1)
-        new_content, num_subs = re.subn(
-            pattern, repl_func, current_content, count=1, flags=re.DOTALL | re.MULTILINE
-        )
-        if num_subs > 0:
-            return new_content
+        idx = ContextualDiffProcessor._find_exact(current_content, anchor, None, None)
+        if idx != -1:
+            return current_content[:idx] + content_to_insert + current_content[idx:]
 
-        raise ValueError(
-            f"Could not find anchor_content for insert_before: '{anchor[:100]}...'. All strategies failed. Ensure anchor and context (if provided) exactly match."
-        )
+        return None
 
     @staticmethod
-    def _apply_insert_after(current_content: str, change: Dict[str, Any]) -> str:
+    def _apply_insert_after(
+        current_content: str, change: Dict[str, Any]
+    ) -> Optional[str]:
         anchor = change.get("anchor_content")
         content_to_insert = change.get("content", "")
         before_ctx = change.get("before_context")
@@ -395,84 +475,86 @@ class ContextualDiffProcessor:
                 "anchor_content is required and cannot be empty for insert_after operation"
             )
 
-        anchor_escaped = re.escape(anchor)
-
         if before_ctx is not None and after_ctx is not None:
             logger.info("Insert_After Strategy 1: Full context")
-            pattern = ContextualDiffProcessor._build_search_pattern(
-                anchor_escaped, before_ctx, after_ctx, "ApplyInsertAfter Full"
-            )
-            repl_func = (
-                lambda m: m.group(1)
-                + m.group(2)
-                + m.group(3)
-                + content_to_insert
-                + m.group(4)
-                + m.group(5)
+            idx = ContextualDiffProcessor._find_exact(
+                current_content, anchor, before_ctx, after_ctx
             )
-            new_content, num_subs = re.subn(
-                pattern,
-                repl_func,
-                current_content,
-                count=1,
-                flags=re.DOTALL | re.MULTILINE,
+            if idx != -1:
+                anchor_end = idx + len(anchor)
+                return (
+                    current_content[:anchor_end]
+                    + content_to_insert
+                    + current_content[anchor_end:]
+                )
+
+            pattern = ContextualDiffProcessor._compile_search_pattern(
+                anchor, before_ctx, after_ctx
             )
-            if num_subs > 0:
-                return new_content
+            match = pattern.search(current_content)
+            if match:
+                return ContextualDiffProcessor._splice_term(
+                    current_content, match, 3, match.group(3) + content_to_insert
+                )
 
         if before_ctx is not None:
             logger.info("Insert_After Strategy 2: Before context")
-            pattern = ContextualDiffProcessor._build_search_pattern(
-                anchor_escaped, before_ctx, None, "ApplyInsertAfter Before"
-            )
-            repl_func = (
-                lambda m: m.group(1) + m.group(2) + m.group(3) + content_to_insert
+            idx = ContextualDiffProcessor._find_exact(
+                current_content, anchor, before_ctx, None
             )
-            new_content, num_subs = re.subn(
-                pattern,
-                repl_func,
-                current_content,
-                count=1,
-                flags=re.DOTALL | re.MULTILINE,
+            if idx != -1:
+                anchor_end = idx + len(anchor)
+                return (
+                    current_content[:anchor_end]
+                    + content_to_insert
+                    + current_content[anchor_end:]
+                )
+
+            pattern = ContextualDiffProcessor._compile_search_pattern(
+                anchor, before_ctx, None
             )
-            if num_subs > 0:
-                return new_content
+            match = pattern.search(current_content)
+            if match:
+                return ContextualDiffProcessor._splice_term(
+                    current_content, match, 3, match.group(3) + content_to_insert
+                )
 
         if after_ctx is not None:
             logger.info("Insert_After Strategy 3: After context")
-            pattern = ContextualDiffProcessor._build_search_pattern(
-                anchor_escaped, None, after_ctx, "ApplyInsertAfter After"
+            idx = ContextualDiffProcessor._find_exact(
+                current_content, anchor, None, after_ctx
             )
-            repl_func = (
-                lambda m: m.group(1) + content_to_insert + m.group(2) + m.group(3)
-            )
-            new_content, num_subs = re.subn(
-                pattern,
-                repl_func,
-                current_content,
-                count=1,
-                flags=re.DOTALL | re.MULTILINE,
+            if idx != -1:
+                anchor_end = idx + len(anchor)
+                return (
+                    current_content[:anchor_end]
+                    + content_to_insert
+                    + current_content[anchor_end:]
+                )
+
+            pattern = ContextualDiffProcessor._compile_search_pattern(
+                anchor, None, after_ctx
             )
-            if num_subs > 0:
-                return new_content
+            match = pattern.search(current_content)
+            if match:
+                return ContextualDiffProcessor._splice_term(
+                    current_content, match, 1, match.group(1) + content_to_insert
+                )
 
         logger.info("Insert_After Strategy 4: Direct anchor")
-        pattern = ContextualDiffProcessor._build_search_pattern(
-            anchor_escaped, None, None, "ApplyInsertAfter Direct"
-        )
-        repl_func = lambda m: m.group(1) + content_to_insert
-        new_content, num_subs = re.subn(
-            pattern, repl_func, current_content, count=1, flags=re.DOTALL | re.MULTILINE
-        )
-        if num_subs > 0:
-            return new_content
+        idx = ContextualDiffProcessor._find_exact(current_content, anchor, None, None)
+        if idx != -1:
+            anchor_end = idx + len(anchor)
+            return (
+                current_content[:anchor_end]
+                + content_to_insert
+                + current_content[anchor_end:]
+            )
 
-        raise ValueError(
-            f"Could not find anchor_content for insert_after: '{anchor[:100]}...'. All strategies failed. Ensure anchor and context (if provided) exactly match."
-        )
+        return None
 
     @staticmethod
-    def _apply_delete(current_content: str, change: Dict[str, Any]) -> str:
+    def _apply_delete(current_content: str, change: Dict[str, Any]) -> Optional[str]:
         target = change.get("target_content")
         before_ctx = change.get("before_context")
         after_ctx = change.get("after_context")
@@ -482,118 +564,192 @@ class ContextualDiffProcessor:
                 "target_content is required and cannot be empty for delete operation"
             )
 
-        target_escaped = re.escape(target)
-
         if before_ctx is not None and after_ctx is not None:
             logger.info("Delete Strategy 1: Full context")
-            pattern = ContextualDiffProcessor._build_search_pattern(
-                target_escaped, before_ctx, after_ctx, "ApplyDelete Full"
+            idx = ContextualDiffProcessor._find_exact(
+                current_content, target, before_ctx, after_ctx
             )
-            repl_func = lambda m: m.group(1) + m.group(2) + m.group(4) + m.group(5)
-            new_content, num_subs = re.subn(
-                pattern,
-                repl_func,
-                current_content,
-                count=1,
-                flags=re.DOTALL | re.MULTILINE,
+            if idx != -1:
+                return current_content[:idx] + current_content[idx + len(target) :]
+
+            pattern = ContextualDiffProcessor._compile_search_pattern(
+                target, before_ctx, after_ctx
             )
-            if num_subs > 0:
-                return new_content
+            match = pattern.search(current_content)
+            if match:
+                return ContextualDiffProcessor._splice_term(
+                    current_content, match, 3, ""
+                )
 
         if before_ctx is not None:
             logger.info("Delete Strategy 2: Before context")
-            pattern = ContextualDiffProcessor._build_search_pattern(
-                target_escaped, before_ctx, None, "ApplyDelete Before"
+            idx = ContextualDiffProcessor._find_exact(
+                current_content, target, before_ctx, None
             )
-            repl_func = lambda m: m.group(1) + m.group(2)
-            new_content, num_subs = re.subn(
-                pattern,
-                repl_func,
-                current_content,
-                count=1,
-                flags=re.DOTALL | re.MULTILINE,
+            if idx != -1:
+                return current_content[:idx] + current_content[idx + len(target) :]
+
+            pattern = ContextualDiffProcessor._compile_search_pattern(
+                target, before_ctx, None
             )
-            if num_subs > 0:
-                return new_content
+            match = pattern.search(current_content)
+            if match:
+                return ContextualDiffProcessor._splice_term(
+                    current_content, match, 3, ""
+                )
 
         if after_ctx is not None:
             logger.info("Delete Strategy 3: After context")
-            pattern = ContextualDiffProcessor._build_search_pattern(
-                target_escaped, None, after_ctx, "ApplyDelete After"
+            idx = ContextualDiffProcessor._find_exact(
+                current_content, target, None, after_ctx
             )
-            repl_func = lambda m: m.group(2) + m.group(3)
-            new_content, num_subs = re.subn(
-                pattern,
-                repl_func,
-                current_content,
-                count=1,
-                flags=re.DOTALL | re.MULTILINE,
+            if idx != -1:
+                return current_content[:idx] + current_content[idx + len(target) :]
+
+            pattern = ContextualDiffProcessor._compile_search_pattern(
+                target, None, after_ctx
             )
-            if num_subs > 0:
-                return new_content
+            match = pattern.search(current_content)
+            if match:
+                return ContextualDiffProcessor._splice_term(
+                    current_content, match, 1, ""
+                )
 
         logger.info("Delete Strategy 4: Direct target")
-        pattern = ContextualDiffProcessor._build_search_pattern(
-            target_escaped, None, None, "ApplyDelete Direct"
-        )
-        repl_func = lambda m: ""
-        new_content, num_subs = re.subn(
-            pattern, repl_func, current_content, count=1, flags=re.DOTALL | re.MULTILINE
-        )
-        if num_subs > 0:
-            return new_content
+        idx = ContextualDiffProcessor._find_exact(current_content, target, None, None)
+        if idx != -1:
+            return current_content[:idx] + current_content[idx + len(target) :]
 
-        raise ValueError(
-            f"Could not find target_content for delete: '{target[:100]}...'. All strategies failed. Ensure target and context (if provided) exactly match."
-        )
+        return None
 
     @staticmethod
     def apply_contextual_changes(
-        original_content: str, changes: List[Dict[str, Any]]
+        original_content: str, changes: List[Dict[str, Any]], strict: bool = True
     ) -> str:
-        modified_content = original_content
-        for i, change_item in enumerate(changes):
-            change_data = (
+        """Applies contextual changes in order, each to the result of the previous.
+
+        When a change's target/anchor cannot be found, a ValueError is raised if
+        strict is True; otherwise the change is logged and skipped.
+        """
+        change_dicts = [
+            (
                 change_item
                 if isinstance(change_item, dict)
                 else change_item.model_dump(exclude_none=True)
             )
+            for change_item in changes
+        ]
+        cache_key = _apply_cache_key(original_content, change_dicts)
+        with _apply_cache_lock:
+            cached_content = _apply_cache.get(cache_key)
+            if cached_content is not None:
+                _apply_cache.move_to_end(cache_key)
+        if cached_content is not None:
+            logger.info("Reusing result of identical contextual changes")
+            return cached_content
+
+        modified_content = original_content
+        skipped_changes = 0
+        for i, change_data in enumerate(change_dicts):
             operation = change_data.get("operation")
             description = change_data.get("description", f"Change {i+1} ({operation})")
             logger.info(f"Applying contextual change: {description}")
 
             if operation == "replace":
-                modified_content = ContextualDiffProcessor._apply_replace(
+                new_content = ContextualDiffProcessor._apply_replace(
                     modified_content, change_data
                 )
             elif operation == "insert_before":
-                modified_content = ContextualDiffProcessor._apply_insert_before(
+                new_content = ContextualDiffProcessor._apply_insert_before(
                     modified_content, change_data
                 )
             elif operation == "insert_after":
-                modified_content = ContextualDiffProcessor._apply_insert_after(
+                new_content = ContextualDiffProcessor._apply_insert_after(
                     modified_content, change_data
                 )
             elif operation == "delete":
-                modified_content = ContextualDiffProcessor._apply_delete(
+                new_content = ContextualDiffProcessor._apply_delete(
                     modified_content, change_data
                 )
             else:
                 err_msg = f"Unsupported contextual operation: '{operation}' for change: {description}"
                 logger.error(err_msg)
                 raise ValueError(err_msg)
+
+            if new_content is None:
+                term = change_data.get(
+                    "anchor_content"
+                    if operation in ["insert_before", "insert_after"]
+                    else "target_content"
+                )
+                err_msg = ContextualDiffProcessor._NOT_FOUND_MESSAGES[operation].format(
+                    term=term[:100]
+                )
+                if strict:
+                    logger.error(err_msg)
+                    raise ValueError(err_msg)
+                logger.warning(f"Skipping contextual change '{description}': {err_msg}")
+                skipped_changes += 1
+                continue
+            modified_content = new_content
+
+        if skipped_changes:
+            return modified_content
+        with _apply_cache_lock:
+            _apply_cache[cache_key] = modified_content
+            if len(_apply_cache) > _APPLY_CACHE_MAX_ENTRIES:
+                _apply_cache.popitem(last=False)
         return modified_content
 
+    @staticmethod
+    def apply_with_validation(
+        original_content: str, changes: List[Dict[str, Any]]
+    ) -> Tuple[bool, str, str]:
+        """Validates and applies contextual changes in one call.
+
+        Returns (valid, error_message, new_content). On failure new_content is
+        original_content unchanged. Validation locates every target with one
+        scan of the content, so callers do not need a separate
+        validate_contextual_changes pass before applying.
+        """
+        valid, err_msg = ContextualDiffProcessor.validate_contextual_changes(
+            original_content, changes
+        )
+        if not valid:
+            return False, err_msg, original_content
+        try:
+            new_content = ContextualDiffProcessor.apply_contextual_changes(
+                original_content, changes
+            )
+        except ValueError as e:
+            return False, str(e), original_content
+        return True, "", new_content
+
     @staticmethod
     def validate_contextual_changes(
         original_content: str, changes: List[Dict[str, Any]]
     ) -> Tuple[bool, str]:
-        for i, change_item in enumerate(changes):
-            change_data = (
+        change_dicts = [
+            (
                 change_item
                 if isinstance(change_item, dict)
                 else change_item.model_dump(exclude_none=True)
             )
+            for change_item in changes
+        ]
+        # Locate every target/anchor in one pass over the content up front.
+        present_terms = ContextualDiffProcessor._find_present_terms(
+            original_content,
+            tuple(
+                (
+                    chg.get("anchor_content")
+                    if chg.get("operation") in ["insert_before", "insert_after"]
+                    else chg.get("target_content")
+                )
+                for chg in change_dicts
+            ),
+        )
+        for i, change_data in enumerate(change_dicts):
             operation = change_data.get("operation")
             description = change_data.get("description", f"Change {i+1}")
 
@@ -650,8 +806,11 @@ class ContextualDiffProcessor:
             before_ctx_val = change_data.get("before_context")
             after_ctx_val = change_data.get("after_context")
 
-            if not ContextualDiffProcessor._find_match_for_validation(
-                original_content, term_to_find, before_ctx_val, after_ctx_val
+            if (
+                term_to_find not in present_terms
+                and not ContextualDiffProcessor._find_match_for_validation(
+                    original_content, term_to_find, before_ctx_val, after_ctx_val
+                )
             ):
                 error_detail = (
                     f"Could not find {term_type_for_error} '{str(term_to_find)[:100]}...' "
@@ -671,17 +830,40 @@ class ContextualDiffProcessor:
         return True, ""
 
 
+@functools.lru_cache(maxsize=8)
+def _line_offsets(text: str) -> Tuple[int, ...]:
+    """Returns the start offset of every line of text (as split by
+    str.splitlines), followed by len(text). Cached so that validating,
+    previewing and applying changes to the same content split it only once."""
+    return tuple(accumulate(map(len, text.splitlines(keepends=True)), initial=0))
+
+
+def _sorted_changes(
+    changes: List[Dict[str, Any]], reverse: bool = False
+) -> List[Dict[str, Any]]:
+    """Sorts legacy line changes by their start line (or insert line). Each
+    change's key is looked up once, and the sort stays stable for equal keys
+    in both directions."""
+    decorated = [
+        (change.get("start_line", change.get("line", 0)), change) for change in changes
+    ]
+    decorated.sort(key=itemgetter(0), reverse=reverse)
+    return [change for _, change in decorated]
+
+
 class DiffProcessor:  # Legacy line-based
     @staticmethod
     def apply_partial_changes(
         original_content: str, changes: List[Dict[str, Any]]
     ) -> str:
-        lines = original_content.splitlines(keepends=True)
-        total_lines = len(lines)
+        offsets = _line_offsets(original_content)
+        total_lines = len(offsets) - 1
         logger.info(f"Legacy partial: Original content has {total_lines} lines")
-        sorted_changes = sorted(
-            changes, key=lambda x: x.get("start_line", x.get("line", 0)), reverse=True
-        )
+        sorted_changes = _sorted_changes(changes, reverse=True)
+        # Resolve every change to a (start_offset, end_offset, new_text) span of the
+        # original content, then splice the spans in instead of mutating a list of
+        # lines (each middle-of-list slice assignment shifts every following line).
+        spans = []
         for i, change in enumerate(sorted_changes):
             operation = change.get("operation")
             logger.info(
@@ -696,10 +878,7 @@ class DiffProcessor:  # Legacy line-based
                         f"Legacy partial: Line numbers out of bounds for replace: {start_line+1}-{end_line+1}"
                     )
                     continue
-                lines[start_line : end_line + 1] = (
-                    [new_content] if new_content or new_content == "" else []
-                )
-                total_lines = len(lines)
+                spans.append((offsets[start_line], offsets[end_line + 1], new_content))
             elif operation == "insert":
                 line_idx = change["line"]
                 new_content = change.get("content", "")
@@ -708,8 +887,7 @@ class DiffProcessor:  # Legacy line-based
                         f"Legacy partial: Insert line index {line_idx} out of bounds"
                     )
                     continue
-                lines.insert(line_idx, new_content)
-                total_lines = len(lines)
+                spans.append((offsets[line_idx], offsets[line_idx], new_content))
             elif operation == "delete":
                 start_line = change["start_line"] - 1
                 end_line = change.get("end_line", change["start_line"]) - 1
@@ -718,9 +896,34 @@ class DiffProcessor:  # Legacy line-based
                         f"Legacy partial: Delete line numbers out of bounds: {start_line+1}-{end_line+1}"
                     )
                     continue
-                del lines[start_line : end_line + 1]
-                total_lines = len(lines)
-        return "".join(lines)
+                spans.append((offsets[start_line], offsets[end_line + 1], ""))
+
+        # Walk the spans from the end of the document backwards to drop any that
+        # overlap a change already accepted. The sort is stable: inserts at the
+        # same line keep the order above, which places the later-listed insert
+        # first, as before.
+        spans.sort(key=lambda span: (span[0], span[1]), reverse=True)
+        accepted_spans = []
+        limit = len(original_content)
+        for span in spans:
+            if span[1] > limit:
+                logger.error(
+                    "Legacy partial: Skipping change overlapping an already applied change"
+                )
+                continue
+            accepted_spans.append(span)
+            limit = span[0]
+
+        # Rebuild the content in one forward pass: untouched text between spans,
+        # then each span's new text, joined once at the end.
+        fragments = []
+        cursor = 0
+        for start_offset, end_offset, new_content in reversed(accepted_spans):
+            fragments.append(original_content[cursor:start_offset])
+            fragments.append(new_content)
+            cursor = end_offset
+        fragments.append(original_content[cursor:])
+        return "".join(fragments)
 
     @staticmethod
     def generate_unified_diff(
@@ -743,9 +946,8 @@ class DiffProcessor:  # Legacy line-based
     def validate_changes(
         original_content: str, changes: List[Dict[str, Any]]
     ) -> Tuple[bool, str]:
-        lines = original_content.splitlines()
-        max_line_num = len(lines)
-        max_line_idx_insert = len(lines)
+        max_line_num = len(_line_offsets(original_content)) - 1
+        max_line_idx_insert = max_line_num
 
         for idx, change in enumerate(changes):
             op = change.get("operation")
@@ -786,11 +988,8 @@ class DiffProcessor:  # Legacy line-based
 def create_change_preview(
     original_content: str, changes: List[Dict[str, Any]], file_path: str
 ) -> str:  # Legacy preview
-    lines = original_content.splitlines()
     preview_parts = [f"Preview of legacy line-based changes for: {file_path}"]
-    sorted_changes = sorted(
-        changes, key=lambda x: x.get("start_line", x.get("line", 0))
-    )
+    sorted_changes = _sorted_changes(changes)
     for chg in sorted_changes:
         op = chg.get("operation")
         if op == "replace":
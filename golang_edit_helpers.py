@@ -1,8 +1,178 @@
 # golang_edit_helpers.py - New file for Go-specific editing
+import functools
 import re
+from bisect import bisect_right
 from typing import Any, Dict, List, Tuple, Optional
 
 
+@functools.lru_cache(maxsize=32)
+def _line_spans(content: str) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """Start and end offsets of every line, ends excluding the line break
+
+    Lines are the ones ``content.splitlines()`` would produce.
+    """
+    starts: List[int] = []
+    ends: List[int] = []
+    pos = 0
+    for line, bare in zip(content.splitlines(True), content.splitlines()):
+        starts.append(pos)
+        ends.append(pos + len(bare))
+        pos += len(line)
+    return tuple(starts), tuple(ends)
+
+
+def _line_range(content: str, first: int, last: int) -> str:
+    """Text of lines ``first`` up to ``last`` (exclusive), sliced in place"""
+    starts, ends = _line_spans(content)
+    last = min(last, len(starts))
+    if first >= last:
+        return ""
+    return content[starts[first] : ends[last - 1]]
+
+
+@functools.lru_cache(maxsize=1024)
+def _quoted_re(text: str) -> "re.Pattern[str]":
+    """Compiled pattern matching ``text`` in matching double or single quotes"""
+    return re.compile(rf"([\"']){re.escape(text)}\1")
+
+
+@functools.lru_cache(maxsize=1024)
+def _field_re(name: str) -> "re.Pattern[str]":
+    """Compiled pattern matching a struct field line declaring ``name``"""
+    return re.compile(rf"^[^\S\r\n]*{re.escape(name)}[^\S\r\n]+", re.MULTILINE)
+
+
+# String, raw string and rune literals plus line and block comments
+_GO_STRIP = re.compile(
+    r'"(?:\\.|[^"\\\n])*"'
+    r"|'(?:\\.|[^'\\\n])*'"
+    r"|`[^`]*`"
+    r"|//[^\n]*"
+    r"|/\*.*?\*/",
+    re.DOTALL,
+)
+
+
+def _blank_literal(match: "re.Match[str]") -> str:
+    # Same length, so offsets into the blanked text are offsets into content
+    return " " * (match.end() - match.start())
+
+
+@functools.lru_cache(maxsize=8)
+def _brace_text(content: str) -> str:
+    """``content`` with literals and comments blanked out by spaces
+
+    Braces that live in strings, runes or comments no longer take part in
+    block matching, while every other character keeps its offset.
+    """
+    return _GO_STRIP.sub(_blank_literal, content)
+
+
+def _find_block_end(text: str, start: int) -> int:
+    """Offset of the ``}`` closing the first block opened at or after ``start``
+
+    Hops between braces with ``str.find`` rather than walking characters.
+    Returns -1 when no block opens or it never closes.
+    """
+    pos = text.find("{", start)
+    if pos == -1:
+        return -1
+    depth = 1
+    next_open = text.find("{", pos + 1)
+    next_close = text.find("}", pos + 1)
+    while next_close != -1:
+        if next_open != -1 and next_open < next_close:
+            depth += 1
+            next_open = text.find("{", next_open + 1)
+        else:
+            depth -= 1
+            if depth == 0:
+                return next_close
+            next_close = text.find("}", next_close + 1)
+    return -1
+
+
+def _block_end_line(content: str, start_line: int) -> int:
+    """Line closing the block declared on ``start_line``, or ``start_line``"""
+    starts = _line_spans(content)[0]
+    end = _find_block_end(_brace_text(content), starts[start_line])
+    if end == -1:
+        return start_line
+    return bisect_right(starts, end) - 1
+
+
+# Top-level declarations the helpers anchor on, one per line
+_GO_DECL = re.compile(
+    r"^[ \t]*(?:"
+    r"func[ \t]+(?:\(\w+[ \t]+\*?\w+\)[ \t]+)?(?P<func>\w+)[ \t]*\("
+    r"|type[ \t]+(?P<struct>\w+)[ \t]+struct[ \t]*\{"
+    r"|(?P<import_block>import \()"
+    r'|(?P<import_single>import [^\n]*")'
+    r"|(?P<package>package )"
+    r")",
+    re.MULTILINE,
+)
+_IMPORT_BLOCK_END = re.compile(r"^[^\S\n]*\)[^\S\n]*$", re.MULTILINE)
+
+
+@functools.lru_cache(maxsize=32)
+def _symbol_index(content: str) -> Dict[str, Any]:
+    """Tokenize the top-level declarations of ``content`` in a single pass
+
+    ``func`` and ``struct`` map each name to its ``(start, end)`` lines, the
+    first declaration of a name winning. ``import`` holds the first import
+    as ``(style, start, end)`` with ``end`` -1 for an unclosed block,
+    ``import_span`` the offsets covering every import declaration, and
+    ``package`` the line of the package clause. Line numbers index into
+    ``content.splitlines()``.
+    """
+    line_starts, line_ends = _line_spans(content)
+    index: Dict[str, Any] = {
+        "func": {},
+        "struct": {},
+        "import": None,
+        "import_span": None,
+        "package": None,
+    }
+    for match in _GO_DECL.finditer(content):
+        kind = match.lastgroup
+        line_no = bisect_right(line_starts, match.start()) - 1
+        if kind in ("func", "struct"):
+            name = match.group(kind)
+            if name not in index[kind]:
+                index[kind][name] = (line_no, _block_end_line(content, line_no))
+        elif kind == "package":
+            if index["package"] is None:
+                index["package"] = line_no
+        else:
+            end_line = line_no
+            if kind == "import_block":
+                block_end = _IMPORT_BLOCK_END.search(content, match.end())
+                end_line = (
+                    bisect_right(line_starts, block_end.start()) - 1
+                    if block_end
+                    else -1
+                )
+            if index["import"] is None:
+                index["import"] = (kind[len("import_") :], line_no, end_line)
+                span_start = line_starts[line_no]
+            else:
+                span_start = index["import_span"][0]
+            index["import_span"] = (
+                span_start,
+                line_ends[end_line] if end_line != -1 else len(content),
+            )
+    return index
+
+
+# create_batch_edits op types and the helper each one dispatches to
+_BATCH_HELPERS = {
+    "function": "create_function_edit",
+    "struct_field": "create_struct_field_edit",
+    "import": "create_import_edit",
+}
+
+
 class GolangEditHelper:
     """Helper class for creating precise Go code edits with context"""
 
@@ -15,68 +185,38 @@ class GolangEditHelper:
     ) -> Dict[str, Any]:
         """Create a context-aware edit for a Go function"""
 
-        lines = content.splitlines()
-
         # Find function definition
-        func_pattern = (
-            rf"func\s+(?:\(\w+\s+\*?\w+\)\s+)?{re.escape(function_name)}\s*\("
-        )
-
-        for i, line in enumerate(lines):
-            if re.search(func_pattern, line):
-                # Find function start
-                func_start = i
-
-                # Find function end (matching braces)
-                brace_count = 0
-                func_end = func_start
-
-                for j in range(func_start, len(lines)):
-                    for char in lines[j]:
-                        if char == "{":
-                            brace_count += 1
-                        elif char == "}":
-                            brace_count -= 1
-                            if brace_count == 0:
-                                func_end = j
-                                break
-                    if brace_count == 0:
-                        break
-
-                # Extract contexts
-                before_context = (
-                    "\n".join(lines[max(0, func_start - 2) : func_start])
-                    if func_start > 0
-                    else ""
-                )
-                after_context = (
-                    "\n".join(lines[func_end + 1 : min(len(lines), func_end + 3)])
-                    if func_end < len(lines) - 1
-                    else ""
-                )
-
-                # Target content (function to replace)
-                target_content = "\n".join(lines[func_start : func_end + 1])
-
-                # Replacement content
-                if include_signature:
-                    # Keep the original signature, replace body only
-                    signature_line = lines[func_start]
-                    replacement = f"{signature_line} {{\n{new_function_body}\n}}"
-                else:
-                    replacement = new_function_body
-
-                return {
-                    "operation": "replace",
-                    "target_content": target_content,
-                    "replacement_content": replacement,
-                    "before_context": before_context,
-                    "after_context": after_context,
-                    "function_name": function_name,
-                    "confidence": "high",
-                }
-
-        raise ValueError(f"Function '{function_name}' not found")
+        func_span = None
+        if function_name in content:
+            func_span = _symbol_index(content)["func"].get(function_name)
+        if func_span is None:
+            raise ValueError(f"Function '{function_name}' not found")
+        func_start, func_end = func_span
+
+        # Extract contexts
+        before_context = _line_range(content, max(0, func_start - 2), func_start)
+        after_context = _line_range(content, func_end + 1, func_end + 3)
+
+        # Target content (function to replace)
+        target_content = _line_range(content, func_start, func_end + 1)
+
+        # Replacement content
+        if include_signature:
+            # Keep the original signature, replace body only
+            signature_line = _line_range(content, func_start, func_start + 1)
+            replacement = f"{signature_line} {{\n{new_function_body}\n}}"
+        else:
+            replacement = new_function_body
+
+        return {
+            "operation": "replace",
+            "target_content": target_content,
+            "replacement_content": replacement,
+            "before_context": before_context,
+            "after_context": after_context,
+            "function_name": function_name,
+            "confidence": "high",
+        }
 
     @staticmethod
     def create_struct_field_edit(
@@ -84,168 +224,130 @@ class GolangEditHelper:
     ) -> Dict[str, Any]:
         """Add or modify a struct field with precise context"""
 
-        lines = content.splitlines()
+        starts = _line_spans(content)[0]
 
         # Find struct definition
-        struct_pattern = rf"type\s+{re.escape(struct_name)}\s+struct\s*\{{"
-
-        for i, line in enumerate(lines):
-            if re.search(struct_pattern, line):
-                struct_start = i
-
-                # Find struct end
-                brace_count = 0
-                struct_end = struct_start
-
-                for j in range(struct_start, len(lines)):
-                    for char in lines[j]:
-                        if char == "{":
-                            brace_count += 1
-                        elif char == "}":
-                            brace_count -= 1
-                            if brace_count == 0:
-                                struct_end = j
-                                break
-                    if brace_count == 0:
-                        break
-
-                # Look for existing field
-                field_pattern = rf"\s*{re.escape(field_name)}\s+"
-                field_found = False
-                field_line = -1
-
-                for j in range(struct_start + 1, struct_end):
-                    if re.match(field_pattern, lines[j]):
-                        field_found = True
-                        field_line = j
-                        break
-
-                if field_found:
-                    # Replace existing field
-                    before_context = "\n".join(
-                        lines[max(0, field_line - 1) : field_line]
-                    )
-                    after_context = "\n".join(
-                        lines[field_line + 1 : min(len(lines), field_line + 2)]
-                    )
-                    target_content = lines[field_line]
-
-                    return {
-                        "operation": "replace",
-                        "target_content": target_content,
-                        "replacement_content": f"    {new_field_definition}",
-                        "before_context": before_context,
-                        "after_context": after_context,
-                        "confidence": "high",
-                    }
-                else:
-                    # Add new field before closing brace
-                    before_context = "\n".join(
-                        lines[max(0, struct_end - 2) : struct_end]
-                    )
-                    after_context = "\n".join(
-                        lines[struct_end : min(len(lines), struct_end + 2)]
-                    )
-
-                    return {
-                        "operation": "insert_before",
-                        "anchor_content": lines[
-                            struct_end
-                        ].strip(),  # The closing brace
-                        "content": f"    {new_field_definition}\n",
-                        "before_context": before_context,
-                        "confidence": "high",
-                    }
-
-        raise ValueError(f"Struct '{struct_name}' not found")
+        struct_span = None
+        if struct_name in content:
+            struct_span = _symbol_index(content)["struct"].get(struct_name)
+        if struct_span is None:
+            raise ValueError(f"Struct '{struct_name}' not found")
+        struct_start, struct_end = struct_span
+
+        # Look for existing field
+        field_match = None
+        if struct_end > struct_start + 1:
+            field_match = _field_re(field_name).search(
+                content, starts[struct_start + 1], starts[struct_end]
+            )
+
+        if field_match:
+            field_line = bisect_right(starts, field_match.start()) - 1
+            # Replace existing field
+            before_context = _line_range(content, max(0, field_line - 1), field_line)
+            after_context = _line_range(content, field_line + 1, field_line + 2)
+            target_content = _line_range(content, field_line, field_line + 1)
+
+            return {
+                "operation": "replace",
+                "target_content": target_content,
+                "replacement_content": f"    {new_field_definition}",
+                "before_context": before_context,
+                "after_context": after_context,
+                "confidence": "high",
+            }
+        else:
+            # Add new field before closing brace
+            before_context = _line_range(content, max(0, struct_end - 2), struct_end)
+            closing_line = _line_range(content, struct_end, struct_end + 1)
+
+            return {
+                "operation": "insert_before",
+                "anchor_content": closing_line.strip(),  # The closing brace
+                "content": f"    {new_field_definition}\n",
+                "before_context": before_context,
+                "confidence": "high",
+            }
 
     @staticmethod
     def create_import_edit(content: str, import_path: str) -> Dict[str, Any]:
         """Add an import with proper context"""
 
-        lines = content.splitlines()
+        index = _symbol_index(content)
 
-        # Check if import already exists
-        if f'"{import_path}"' in content or f"'{import_path}'" in content:
+        # Check if import already exists among the import declarations
+        import_span = index["import_span"]
+        if import_span and _quoted_re(import_path).search(content, *import_span):
             return {"operation": "skip", "reason": "Import already exists"}
 
-        # Find import block
-        import_start = -1
-        import_end = -1
-        single_import = False
-
-        for i, line in enumerate(lines):
-            if line.strip().startswith("import ("):
-                import_start = i
-                # Find closing parenthesis
-                for j in range(i + 1, len(lines)):
-                    if lines[j].strip() == ")":
-                        import_end = j
-                        break
-                break
-            elif line.strip().startswith("import ") and '"' in line:
-                # Single import line
-                import_start = i
-                import_end = i
-                single_import = True
-                break
-
-        if import_start == -1:
-            # No imports yet, add after package declaration
-            for i, line in enumerate(lines):
-                if line.strip().startswith("package "):
-                    package_line = i
-                    # Add import block after package
-                    return {
-                        "operation": "insert_after",
-                        "anchor_content": line,
-                        "content": f'\n\nimport "{import_path}"',
-                        "confidence": "high",
-                    }
-        else:
-            if single_import:
-                # Convert single import to block
-                existing_import = lines[import_start]
-                before_context = (
-                    "\n".join(lines[max(0, import_start - 1) : import_start])
-                    if import_start > 0
-                    else ""
-                )
-                after_context = (
-                    "\n".join(
-                        lines[import_start + 1 : min(len(lines), import_start + 2)]
-                    )
-                    if import_start < len(lines) - 1
-                    else ""
-                )
-
-                new_import_block = f"""import (
-    {existing_import.strip().replace('import ', '').strip()}
-    "{import_path}"
-)"""
+        # Find import block, or the package clause to add one after
+        imports = index["import"]
 
+        if imports is None:
+            package_line = index["package"]
+            if package_line is not None:
+                # No imports yet, add import block after package
                 return {
-                    "operation": "replace",
-                    "target_content": existing_import,
-                    "replacement_content": new_import_block,
-                    "before_context": before_context,
-                    "after_context": after_context,
-                    "confidence": "high",
-                }
-            else:
-                # Add to existing import block
-                # Insert before closing parenthesis
-                before_context = "\n".join(lines[max(0, import_end - 1) : import_end])
-                after_context = "\n".join(
-                    lines[import_end : min(len(lines), import_end + 2)]
-                )
-
-                return {
-                    "operation": "insert_before",
-                    "anchor_content": lines[import_end].strip(),  # The closing )
-                    "content": f'    "{import_path}"\n',
-                    "before_context": before_context,
+                    "operation": "insert_after",
+                    "anchor_content": _line_range(
+                        content, package_line, package_line + 1
+                    ),
+                    "content": f'\n\nimport "{import_path}"',
                     "confidence": "high",
                 }
+        elif imports[0] == "single":
+            # Convert single import to block
+            import_line = imports[1]
+            existing_import = _line_range(content, import_line, import_line + 1)
+            before_context = _line_range(content, max(0, import_line - 1), import_line)
+            after_context = _line_range(content, import_line + 1, import_line + 2)
+
+            existing_spec = existing_import.strip()[len("import ") :].strip()
+            new_import_block = "\n".join(
+                ["import (", f"    {existing_spec}", f'    "{import_path}"', ")"]
+            )
+
+            return {
+                "operation": "replace",
+                "target_content": existing_import,
+                "replacement_content": new_import_block,
+                "before_context": before_context,
+                "after_context": after_context,
+                "confidence": "high",
+            }
+        elif imports[2] != -1:
+            # Add to existing import block
+            # Insert before closing parenthesis
+            import_end = imports[2]
+            before_context = _line_range(content, max(0, import_end - 1), import_end)
+
+            return {
+                "operation": "insert_before",
+                "anchor_content": ")",  # The closing )
+                "content": f'    "{import_path}"\n',
+                "before_context": before_context,
+                "confidence": "high",
+            }
 
         raise ValueError("Could not determine where to add import")
+
+    @staticmethod
+    def create_batch_edits(
+        content: str, ops: List[Dict[str, Any]]
+    ) -> List[Dict[str, Any]]:
+        """Create several Go edits against the same content in one go
+
+        Each op names the helper with ``type`` (``function``,
+        ``struct_field`` or ``import``) and passes that helper's keyword
+        arguments alongside. The declarations are tokenized once and shared
+        by every op.
+        """
+        edits = []
+        for op in ops:
+            params = dict(op)
+            kind = params.pop("type", None)
+            helper = _BATCH_HELPERS.get(kind)
+            if helper is None:
+                raise ValueError(f"Unknown Go edit type '{kind}'")
+            edits.append(getattr(GolangEditHelper, helper)(content, **params))
+        return edits
@@ -2,26 +2,152 @@ import os
 import json
 import pickle
 import hashlib
+import stat
+import threading
+import time
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple, Set
 import logging
-from dataclasses import dataclass, asdict, field
+import multiprocessing
+from dataclasses import dataclass, asdict, field, fields, replace
 from datetime import datetime
 
 import numpy as np
 from sentence_transformers import SentenceTransformer
 import faiss
-import ast
 import re
 import networkx as nx
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+from code_chunker import _RE_CSS_CLASS, CodeChunker, _chunk_file
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-
-@dataclass
+# Project files larger than this are never indexed
+_MAX_INDEXED_FILE_SIZE = 1024 * 1024
+# Directories, file names and extensions RAGSystem never indexes
+_IGNORE_DIRS = frozenset(
+    {
+        ".git",
+        "__pycache__",
+        ".vscode",
+        ".idea",
+        "node_modules",
+        "venv",
+        ".env",
+        "build",
+        "dist",
+        ".rag_cache",
+        "vendor",  # Go vendor directory
+        "target",  # Rust target directory
+        ".next",  # Next.js build directory
+        "coverage",  # Test coverage directories
+    }
+)
+_IGNORE_FILES = frozenset(
+    {
+        ".DS_Store",
+        ".gitignore",
+        "package-lock.json",
+        "yarn.lock",
+        "go.sum",
+    }
+)
+_IGNORE_EXTENSIONS = frozenset(
+    {
+        ".pyc",
+        ".log",
+        ".swp",
+        ".swo",
+        ".tmp",
+        ".bak",
+        ".min.js",
+        ".min.css",  # Minified files
+        ".map",  # Source maps
+        ".lock",  # Lock files
+    }
+)
+
+# Patterns used by FileDependencyAnalyzer
+_RE_JS_DEFAULT_EXPORT = re.compile(r"export\s+default")
+_RE_JS_NAMED_EXPORT = re.compile(r"export\s+(?:const|let|var|function|class)\s+(\w+)")
+_RE_JS_EXPORT_LIST = re.compile(r"export\s*\{([^}]+)\}")
+_RE_PASCAL_CASE_WORD = re.compile(r"\b[A-Z][a-zA-Z]+\b")
+# Words in a query that point at UI components, for get_ui_related_files
+_UI_TERMS = (
+    "button",
+    "modal",
+    "dialog",
+    "form",
+    "input",
+    "navbar",
+    "header",
+    "footer",
+    "sidebar",
+    "menu",
+    "dropdown",
+    "table",
+    "card",
+    "list",
+    "grid",
+    "layout",
+    "container",
+    "wrapper",
+)
+
+# Words in a query that mark it as a UI request, and ones asking for an edit,
+# for get_relevant_context_smart. Each set is matched as plain substrings of
+# the lowercased query, all terms in a single regex scan
+_QUERY_UI_TERMS = (
+    "ui",
+    "interface",
+    "button",
+    "component",
+    "style",
+    "css",
+    "layout",
+    "design",
+    "visual",
+    "appearance",
+    "top bar",
+    "appbar",
+    "navbar",
+    "header",
+    "footer",
+    "sidebar",
+    "modal",
+    "dialog",
+)
+_QUERY_EDIT_TERMS = (
+    "edit",
+    "change",
+    "modify",
+    "update",
+    "improve",
+    "fix",
+    "refactor",
+    "rewrite",
+    "adjust",
+    "make",
+    "set",
+)
+_RE_QUERY_UI = re.compile("|".join(map(re.escape, _QUERY_UI_TERMS)))
+_RE_QUERY_EDIT = re.compile("|".join(map(re.escape, _QUERY_EDIT_TERMS)))
+
+
+def _is_ignored_file_name(name: str) -> bool:
+    """Check a file name, without its directories, against the ignore lists"""
+    return (
+        name in _IGNORE_FILES
+        or os.path.splitext(name)[1] in _IGNORE_EXTENSIONS
+        or name.startswith(".")
+    )
+
+
+@dataclass(slots=True)
 class CodeChunk:
     """Represents a chunk of code with metadata"""
 
@@ -45,6 +171,40 @@ class CodeChunk:
     ui_components: List[str] = field(default_factory=list)
     css_classes: List[str] = field(default_factory=list)
     dom_ids: List[str] = field(default_factory=list)
+    # Context header, formatted once here instead of on every retrieval
+    header: str = ""
+
+    def __post_init__(self):
+        if not self.header:
+            self.header = (
+                f"\n\n# {self.chunk_type.upper()} "
+                f"({self.start_line}-{self.end_line}): {self.description}\n"
+            )
+
+    def __reduce__(self):
+        # Pickle field values positionally rather than as a name -> value
+        # state per instance, and the embedding as raw bytes
+        values = [getattr(self, f.name) for f in fields(self)]
+        if self.embedding is not None:
+            embedding = np.ascontiguousarray(self.embedding)
+            values[_EMBEDDING_FIELD_INDEX] = (
+                embedding.tobytes(),
+                embedding.dtype.str,
+                embedding.shape,
+            )
+        return (_restore_code_chunk, tuple(values))
+
+
+_EMBEDDING_FIELD_INDEX = [f.name for f in fields(CodeChunk)].index("embedding")
+
+
+def _restore_code_chunk(*values) -> CodeChunk:
+    """Rebuild a CodeChunk pickled by ``CodeChunk.__reduce__``"""
+    chunk = CodeChunk(*values)
+    if chunk.embedding is not None:
+        data, dtype, shape = chunk.embedding
+        chunk.embedding = np.frombuffer(data, dtype=dtype).reshape(shape)
+    return chunk
 
 
 class FileDependencyAnalyzer:
@@ -55,6 +215,12 @@ class FileDependencyAnalyzer:
         self.file_to_symbols = defaultdict(set)  # file -> exported symbols
         self.symbol_to_file = {}  # symbol -> file
         self.ui_dependencies = defaultdict(set)  # component -> files
+        self.css_class_files = defaultdict(set)  # css class -> stylesheet files
+
+    def __setstate__(self, state):
+        # Analyzers cached before css_class_files existed
+        state.setdefault("css_class_files", defaultdict(set))
+        self.__dict__.update(state)
 
     def analyze_project(self, chunks: Dict[str, CodeChunk]) -> None:
         """Build dependency graph from chunks"""
@@ -73,6 +239,11 @@ class FileDependencyAnalyzer:
                 for component in chunk.ui_components:
                     self.ui_dependencies[component].add(file_path)
 
+            # Collect the classes each stylesheet defines
+            if chunk.language == "css":
+                for css_class in _RE_CSS_CLASS.findall(chunk.content):
+                    self.css_class_files[css_class].add(file_path)
+
         # Second pass: build dependency graph
         for chunk in chunks.values():
             file_path = chunk.file_path
@@ -104,21 +275,19 @@ class FileDependencyAnalyzer:
         content = chunk.content
 
         # Default exports
-        if re.search(r"export\s+default", content):
+        if _RE_JS_DEFAULT_EXPORT.search(content):
             self.file_to_symbols[file_path].add(f"{file_path}:default")
             self.symbol_to_file[f"{file_path}:default"] = file_path
 
         # Named exports
-        exports = re.findall(
-            r"export\s+(?:const|let|var|function|class)\s+(\w+)", content
-        )
+        exports = _RE_JS_NAMED_EXPORT.findall(content)
         for export in exports:
             self.file_to_symbols[file_path].add(export)
             self.symbol_to_file[export] = file_path
             chunk.exported_symbols.append(export)
 
         # Export statements
-        export_statements = re.findall(r"export\s*\{([^}]+)\}", content)
+        export_statements = _RE_JS_EXPORT_LIST.findall(content)
         for statement in export_statements:
             symbols = [s.strip() for s in statement.split(",")]
             for symbol in symbols:
@@ -188,22 +357,30 @@ class FileDependencyAnalyzer:
 
         # Get indirect dependencies up to depth
         if depth > 1:
-            paths = nx.single_source_shortest_path(
-                self.dependency_graph, file_path, cutoff=depth
+            distances = nx.single_source_shortest_path_length(
+                self.dependency_graph, file_path, cutoff=depth - 1
             )
-            for target, path in paths.items():
-                if len(path) <= depth:
-                    related.add(target)
-
-        # Get reverse dependencies (files that depend on this file)
-        reverse_graph = self.dependency_graph.reverse()
-        if file_path in reverse_graph:
-            paths = nx.single_source_shortest_path(
-                reverse_graph, file_path, cutoff=depth
+            related.update(distances)
+
+        # Get reverse dependencies (files that depend on this file), walking
+        # a view of the graph rather than a reversed copy of it
+        if depth > 0:
+            reverse_graph = self.dependency_graph.reverse(copy=False)
+            distances = nx.single_source_shortest_path_length(
+                reverse_graph, file_path, cutoff=depth - 1
             )
-            for target, path in paths.items():
-                if len(path) <= depth:
-                    related.add(target)
+            related.update(distances)
+
+        return related
+
+    def get_css_related_files(self, css_classes: List[str]) -> Set[str]:
+        """Get stylesheet files defining any of the given CSS classes"""
+        related = set()
+
+        # Entries are class attribute values, which may list several classes
+        for value in css_classes:
+            for css_class in value.split():
+                related.update(self.css_class_files.get(css_class, ()))
 
         return related
 
@@ -213,37 +390,17 @@ class FileDependencyAnalyzer:
 
         # Extract potential component names from query
         # Look for PascalCase words (typical React components)
-        potential_components = re.findall(r"\b[A-Z][a-zA-Z]+\b", query)
-
-        # Look for specific UI terms
-        ui_terms = [
-            "button",
-            "modal",
-            "dialog",
-            "form",
-            "input",
-            "navbar",
-            "header",
-            "footer",
-            "sidebar",
-            "menu",
-            "dropdown",
-            "table",
-            "card",
-            "list",
-            "grid",
-            "layout",
-            "container",
-            "wrapper",
-        ]
+        potential_components = _RE_PASCAL_CASE_WORD.findall(query)
 
+        # Look for specific UI terms, then match every component against all
+        # of the terms found in a single pass
         query_lower = query.lower()
-        for term in ui_terms:
-            if term in query_lower:
-                # Find components containing this term
-                for component, files in self.ui_dependencies.items():
-                    if term in component.lower():
-                        related.update(files)
+        matched_terms = [term for term in _UI_TERMS if term in query_lower]
+        if matched_terms:
+            for component, files in self.ui_dependencies.items():
+                component_lower = component.lower()
+                if any(term in component_lower for term in matched_terms):
+                    related.update(files)
 
         # Check exact component matches
         for component in potential_components:
@@ -253,936 +410,91 @@ class FileDependencyAnalyzer:
         return related
 
 
-class CodeAnalyzer:
-    """Enhanced code analyzer with dependency extraction"""
-
-    @staticmethod
-    def extract_javascript_imports(content: str) -> Dict[str, List[str]]:
-        """Extract JavaScript/TypeScript imports with their sources"""
-        imports = {}
-
-        # ES6 imports
-        # import { x, y } from 'module'
-        es6_imports = re.findall(
-            r'import\s*\{([^}]+)\}\s*from\s*[\'"]([^\'"]+)[\'"]', content
-        )
-        for symbols, source in es6_imports:
-            symbol_list = [s.strip() for s in symbols.split(",")]
-            imports[source] = symbol_list
-
-        # import x from 'module'
-        default_imports = re.findall(
-            r'import\s+(\w+)\s+from\s*[\'"]([^\'"]+)[\'"]', content
-        )
-        for symbol, source in default_imports:
-            if source in imports:
-                imports[source].append(symbol)
-            else:
-                imports[source] = [symbol]
-
-        # import * as x from 'module'
-        namespace_imports = re.findall(
-            r'import\s*\*\s*as\s+(\w+)\s+from\s*[\'"]([^\'"]+)[\'"]', content
-        )
-        for symbol, source in namespace_imports:
-            if source in imports:
-                imports[source].append(f"* as {symbol}")
-            else:
-                imports[source] = [f"* as {symbol}"]
-
-        return imports
-
-    @staticmethod
-    def extract_ui_components(content: str, language: str) -> List[str]:
-        """Extract UI component references"""
-        components = []
-
-        if language in ["javascript", "typescript"]:
-            # JSX components
-            jsx_components = re.findall(r"<([A-Z]\w+)", content)
-            components.extend(jsx_components)
-
-            # React class components
-            class_components = re.findall(
-                r"class\s+(\w+)\s+extends\s+(?:React\.)?Component", content
-            )
-            components.extend(class_components)
-
-            # Function components (heuristic: PascalCase functions returning JSX)
-            func_components = re.findall(
-                r"(?:function|const)\s+([A-Z]\w+)\s*(?:=|\()", content
-            )
-            components.extend(func_components)
-
-        elif language == "html":
-            # Custom elements
-            custom_elements = re.findall(r"<([a-z]+-[a-z]+)", content)
-            components.extend(custom_elements)
-
-        return list(set(components))  # Remove duplicates
-
-    @classmethod
-    def analyze_code(cls, content: str, file_path: str) -> Dict[str, Any]:
-        """Enhanced code analysis with dependency information"""
-        language = cls.detect_language(file_path)
-        base_analysis = cls.analyze_code_original(content, file_path)
-
-        # Add enhanced analysis
-        if language in ["javascript", "typescript"]:
-            base_analysis["imported_from"] = cls.extract_javascript_imports(content)
-
-        base_analysis["ui_components"] = cls.extract_ui_components(content, language)
-
-        # Extract CSS classes and IDs for style dependencies
-        css_classes = re.findall(r'className\s*=\s*[\'"]([^\'"]+)[\'"]', content)
-        css_classes.extend(re.findall(r'class\s*=\s*[\'"]([^\'"]+)[\'"]', content))
-        base_analysis["css_classes"] = list(set(css_classes))
-
-        dom_ids = re.findall(r'id\s*=\s*[\'"]([^\'"]+)[\'"]', content)
-        base_analysis["dom_ids"] = list(set(dom_ids))
-
-        return base_analysis
-
-    @classmethod
-    def analyze_code_original(cls, content: str, file_path: str) -> Dict[str, Any]:
-        """Original analyze_code method renamed"""
-        # Original implementation from your code
-        language = cls.detect_language(file_path)
-
-        if language == "python":
-            functions, classes, imports = cls.extract_python_elements(content)
-        elif language in ["javascript", "typescript"]:
-            functions, classes, imports = cls.extract_javascript_elements(content)
-        elif language == "golang":
-            functions, classes, imports = cls.extract_golang_elements(content)
-        elif language == "html":
-            functions, classes, imports = cls.extract_html_elements(content)
-        elif language == "css":
-            functions, classes, imports = cls.extract_css_elements(content)
-        else:
-            # Generic extraction for other languages
-            functions = re.findall(
-                r"(?:function|def|func)\s+(\w+)", content, re.IGNORECASE
-            )
-            classes = re.findall(r"class\s+(\w+)", content, re.IGNORECASE)
-            imports = re.findall(
-                r'(?:import|include|require)\s+[\'"]*([^\s\'"]+)',
-                content,
-                re.IGNORECASE,
-            )
-
-        # Calculate complexity (language-specific keywords)
-        if language == "python":
-            complexity_keywords = [
-                "if",
-                "elif",
-                "else",
-                "for",
-                "while",
-                "try",
-                "except",
-                "with",
-            ]
-        elif language in ["javascript", "typescript"]:
-            complexity_keywords = [
-                "if",
-                "else",
-                "for",
-                "while",
-                "try",
-                "catch",
-                "switch",
-                "case",
-            ]
-        elif language == "golang":
-            complexity_keywords = ["if", "else", "for", "switch", "case", "defer", "go"]
-        elif language == "html":
-            complexity_keywords = ["script", "style", "form", "table"]
-        elif language == "css":
-            complexity_keywords = [
-                "@media",
-                "@keyframes",
-                "@supports",
-                "hover",
-                "active",
-            ]
-        else:
-            complexity_keywords = ["if", "else", "for", "while", "try", "catch"]
-
-        complexity_score = sum(
-            len(re.findall(rf"\b{keyword}\b", content, re.IGNORECASE))
-            for keyword in complexity_keywords
-        )
-
-        return {
-            "language": language,
-            "functions": functions,
-            "classes": classes,
-            "imports": imports,
-            "complexity_score": float(complexity_score),
-        }
-
-    # Keep all the original extract_* methods from your implementation
-    @staticmethod
-    def detect_language(file_path: str) -> str:
-        """Detect programming language from file extension"""
-        ext = Path(file_path).suffix.lower()
-        language_map = {
-            ".py": "python",
-            ".js": "javascript",
-            ".ts": "typescript",
-            ".jsx": "javascript",
-            ".tsx": "typescript",
-            ".go": "golang",
-            ".java": "java",
-            ".cpp": "cpp",
-            ".c": "c",
-            ".h": "c",
-            ".hpp": "cpp",
-            ".rs": "rust",
-            ".php": "php",
-            ".rb": "ruby",
-            ".json": "json",
-            ".yaml": "yaml",
-            ".yml": "yaml",
-            ".xml": "xml",
-            ".html": "html",
-            ".htm": "html",
-            ".css": "css",
-            ".scss": "css",
-            ".sass": "css",
-            ".less": "css",
-            ".sql": "sql",
-            ".md": "markdown",
-            ".txt": "text",
-        }
-        return language_map.get(ext, "unknown")
-
-    @staticmethod
-    def extract_python_elements(content: str) -> Tuple[List[str], List[str], List[str]]:
-        """Extract functions, classes, and imports from Python code"""
-        functions = []
-        classes = []
-        imports = []
-
-        try:
-            tree = ast.parse(content)
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    functions.append(node.name)
-                elif isinstance(node, ast.ClassDef):
-                    classes.append(node.name)
-                elif isinstance(node, ast.Import):
-                    for alias in node.names:
-                        imports.append(alias.name)
-                elif isinstance(node, ast.ImportFrom):
-                    if node.module:
-                        imports.append(node.module)
-        except SyntaxError:
-            # If parsing fails, use regex fallback
-            functions.extend(re.findall(r"def\s+(\w+)", content))
-            classes.extend(re.findall(r"class\s+(\w+)", content))
-            imports.extend(re.findall(r"import\s+(\w+)", content))
-            imports.extend(re.findall(r"from\s+(\w+)", content))
-
-        return functions, classes, imports
-
-    @staticmethod
-    def extract_javascript_elements(
-        content: str,
-    ) -> Tuple[List[str], List[str], List[str]]:
-        """Extract functions, classes, and imports from JavaScript/TypeScript"""
-        functions = []
-        classes = []
-        imports = []
-
-        # Function patterns
-        functions.extend(re.findall(r"function\s+(\w+)", content))
-        functions.extend(re.findall(r"const\s+(\w+)\s*=\s*(?:async\s+)?\(", content))
-        functions.extend(re.findall(r"(\w+)\s*:\s*(?:async\s+)?function", content))
-        functions.extend(re.findall(r"(\w+)\s*=\s*(?:async\s+)?\(.*?\)\s*=>", content))
-        functions.extend(re.findall(r"export\s+(?:async\s+)?function\s+(\w+)", content))
-
-        # Class patterns
-        classes.extend(re.findall(r"class\s+(\w+)", content))
-        classes.extend(re.findall(r"export\s+class\s+(\w+)", content))
-
-        # Import patterns
-        imports.extend(re.findall(r'import.*from\s+[\'"]([^\'"]+)[\'"]', content))
-        imports.extend(re.findall(r'require\([\'"]([^\'"]+)[\'"]\)', content))
-        imports.extend(re.findall(r'import\s+[\'"]([^\'"]+)[\'"]', content))
-
-        return functions, classes, imports
-
-    @staticmethod
-    def extract_golang_elements(content: str) -> Tuple[List[str], List[str], List[str]]:
-        """Extract functions, structs, and imports from Go code"""
-        functions = []
-        classes = []  # Structs in Go
-        imports = []
-
-        # Function patterns
-        functions.extend(re.findall(r"func\s+(\w+)", content))
-        functions.extend(
-            re.findall(r"func\s+\(\w+\s+\*?\w+\)\s+(\w+)", content)
-        )  # Methods
-
-        # Struct patterns (classes equivalent in Go)
-        classes.extend(re.findall(r"type\s+(\w+)\s+struct", content))
-        classes.extend(re.findall(r"type\s+(\w+)\s+interface", content))
-
-        # Import patterns
-        imports.extend(re.findall(r'import\s+"([^"]+)"', content))
-        imports.extend(re.findall(r'import\s+\(\s*"([^"]+)"', content))
-        imports.extend(re.findall(r'"([^"]+)"\s*$', content, re.MULTILINE))
-
-        return functions, classes, imports
-
-    @staticmethod
-    def extract_html_elements(content: str) -> Tuple[List[str], List[str], List[str]]:
-        """Extract components, IDs, and classes from HTML"""
-        functions = []  # Custom elements/components
-        classes = []  # CSS classes
-        imports = []  # Scripts and stylesheets
-
-        # Custom elements and components
-        functions.extend(re.findall(r"<(\w+-\w+)", content))  # Custom elements
-        functions.extend(re.findall(r"<([A-Z]\w+)", content))  # React components
-
-        # CSS classes
-        classes.extend(re.findall(r'class\s*=\s*[\'"]([^\'"]+)[\'"]', content))
-
-        # Scripts and stylesheets
-        imports.extend(re.findall(r'<script.*?src\s*=\s*[\'"]([^\'"]+)[\'"]', content))
-        imports.extend(re.findall(r'<link.*?href\s*=\s*[\'"]([^\'"]+)[\'"]', content))
-
-        return functions, classes, imports
-
-    @staticmethod
-    def extract_css_elements(content: str) -> Tuple[List[str], List[str], List[str]]:
-        """Extract selectors, classes, and imports from CSS"""
-        functions = []  # Mixins, functions
-        classes = []  # CSS classes and IDs
-        imports = []  # @import statements
-
-        # CSS classes and IDs
-        classes.extend(re.findall(r"\.([a-zA-Z_-][\w-]*)", content))
-        classes.extend(re.findall(r"#([a-zA-Z_-][\w-]*)", content))
-
-        # CSS functions and mixins (SCSS/SASS)
-        functions.extend(re.findall(r"@mixin\s+([a-zA-Z_-][\w-]*)", content))
-        functions.extend(re.findall(r"@function\s+([a-zA-Z_-][\w-]*)", content))
-
-        # Imports
-        imports.extend(re.findall(r'@import\s+[\'"]([^\'"]+)[\'"]', content))
-        imports.extend(re.findall(r'@import\s+url\([\'"]?([^\'"]+)[\'"]?\)', content))
-
-        return functions, classes, imports
-
-
-class CodeChunker:
-    """Enhanced chunker with UI-aware chunking"""
-
-    def __init__(self, max_chunk_size: int = 2000):
-        self.max_chunk_size = max_chunk_size
-
-    def _create_chunk(
-        self,
-        content: str,
-        file_path: str,
-        start_line: int,
-        end_line: int,
-        chunk_type: str,
-    ) -> Dict[str, Any]:
-        """Enhanced chunk creation with dependency information"""
-        analysis = CodeAnalyzer.analyze_code(content, file_path)
+# Loaded embedding models by name, shared by every RAGSystem in the process
+_embedders: Dict[str, SentenceTransformer] = {}
+_embedders_lock = threading.Lock()
 
-        # Generate description
-        description = self._generate_description(
-            content, file_path, chunk_type, analysis
-        )
 
-        # Create unique chunk ID
-        chunk_id = hashlib.md5(
-            f"{file_path}:{start_line}:{end_line}:{content[:100]}".encode()
-        ).hexdigest()
-
-        return {
-            "content": content,
-            "file_path": file_path,
-            "chunk_id": chunk_id,
-            "start_line": start_line,
-            "end_line": end_line,
-            "chunk_type": chunk_type,
-            "description": description,
-            "imported_from": analysis.get("imported_from", {}),
-            "ui_components": analysis.get("ui_components", []),
-            "css_classes": analysis.get("css_classes", []),
-            "dom_ids": analysis.get("dom_ids", []),
-            **analysis,
-        }
+def _shared_embedder(model_name: str) -> SentenceTransformer:
+    """The process-wide SentenceTransformer for ``model_name``, loaded once"""
+    with _embedders_lock:
+        if model_name not in _embedders:
+            _embedders[model_name] = SentenceTransformer(model_name)
+        return _embedders[model_name]
 
-    # Keep all the original chunking methods from your implementation
-    def chunk_by_functions(self, content: str, file_path: str) -> List[Dict[str, Any]]:
-        """Chunk code by functions and classes"""
-        language = CodeAnalyzer.detect_language(file_path)
-
-        if language == "python":
-            return self._chunk_python(content, file_path)
-        elif language in ["javascript", "typescript"]:
-            return self._chunk_javascript(content, file_path)
-        elif language == "golang":
-            return self._chunk_golang(content, file_path)
-        elif language == "html":
-            return self._chunk_html(content, file_path)
-        elif language == "css":
-            return self._chunk_css(content, file_path)
-        else:
-            return self._chunk_generic(content, file_path)
 
-    def _chunk_python(self, content: str, file_path: str) -> List[Dict[str, Any]]:
-        """Chunk Python code by functions and classes"""
-        chunks = []
-        lines = content.split("\n")
+# Chunking workers start from a fork server, or fresh interpreters where
+# there is none, rather than as forks of this process with its loaded
+# models and threads; code_chunker is all they import
+_INDEX_POOL_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+# Upper bound on chunking workers, however many cores there are
+_MAX_INDEX_WORKERS = 8
 
-        try:
-            tree = ast.parse(content)
-
-            # Get all function and class definitions with their line numbers
-            nodes = []
-            for node in ast.walk(tree):
-                if isinstance(node, (ast.FunctionDef, ast.ClassDef)):
-                    nodes.append(
-                        {
-                            "node": node,
-                            "start": node.lineno - 1,
-                            "type": (
-                                "function"
-                                if isinstance(node, ast.FunctionDef)
-                                else "class"
-                            ),
-                            "name": node.name,
-                        }
-                    )
-
-            # Sort by line number
-            nodes.sort(key=lambda x: x["start"])
-
-            # Create chunks
-            last_end = 0
-            for i, node_info in enumerate(nodes):
-                start_line = node_info["start"]
-
-                # Add module-level code before this function/class
-                if start_line > last_end:
-                    module_content = "\n".join(lines[last_end:start_line])
-                    if module_content.strip():
-                        chunks.append(
-                            self._create_chunk(
-                                content=module_content,
-                                file_path=file_path,
-                                start_line=last_end,
-                                end_line=start_line - 1,
-                                chunk_type="module",
-                            )
-                        )
-
-                # Find end of this function/class
-                end_line = self._find_python_block_end(lines, start_line)
-
-                # Create chunk for this function/class
-                chunk_content = "\n".join(lines[start_line : end_line + 1])
-                chunks.append(
-                    self._create_chunk(
-                        content=chunk_content,
-                        file_path=file_path,
-                        start_line=start_line,
-                        end_line=end_line,
-                        chunk_type=node_info["type"],
-                    )
-                )
-
-                last_end = end_line + 1
-
-            # Add remaining module-level code
-            if last_end < len(lines):
-                module_content = "\n".join(lines[last_end:])
-                if module_content.strip():
-                    chunks.append(
-                        self._create_chunk(
-                            content=module_content,
-                            file_path=file_path,
-                            start_line=last_end,
-                            end_line=len(lines) - 1,
-                            chunk_type="module",
-                        )
-                    )
-
-        except SyntaxError:
-            # Fallback to generic chunking
-            chunks = self._chunk_generic(content, file_path)
-
-        return chunks
-
-    def _find_python_block_end(self, lines: List[str], start_line: int) -> int:
-        """Find the end of a Python function or class block"""
-        if start_line >= len(lines):
-            return len(lines) - 1
-
-        # Get initial indentation
-        start_indent = len(lines[start_line]) - len(lines[start_line].lstrip())
-
-        for i in range(start_line + 1, len(lines)):
-            line = lines[i]
-            if line.strip():  # Non-empty line
-                current_indent = len(line) - len(line.lstrip())
-                if current_indent <= start_indent:
-                    return i - 1
-
-        return len(lines) - 1
-
-    def _chunk_javascript(self, content: str, file_path: str) -> List[Dict[str, Any]]:
-        """Chunk JavaScript/TypeScript code"""
-        chunks = []
-        lines = content.split("\n")
-
-        # Find function boundaries
-        function_starts = []
-        for i, line in enumerate(lines):
-            if re.match(
-                r"^\s*(?:export\s+)?(?:async\s+)?(?:function|const\s+\w+\s*=|class|interface)",
-                line,
-            ):
-                function_starts.append(i)
-
-        last_end = 0
-        for start in function_starts:
-            # Add code before this function
-            if start > last_end:
-                module_content = "\n".join(lines[last_end:start])
-                if module_content.strip():
-                    chunks.append(
-                        self._create_chunk(
-                            content=module_content,
-                            file_path=file_path,
-                            start_line=last_end,
-                            end_line=start - 1,
-                            chunk_type="module",
-                        )
-                    )
-
-            # Find end of function (simple b
-            # Find end of function (simple brace counting)
-            end = self._find_js_block_end(lines, start)
-            chunk_content = "\n".join(lines[start : end + 1])
-
-            # Determine chunk type
-            chunk_type = "function"
-            if "class" in lines[start] or "interface" in lines[start]:
-                chunk_type = "class"
-
-            chunks.append(
-                self._create_chunk(
-                    content=chunk_content,
-                    file_path=file_path,
-                    start_line=start,
-                    end_line=end,
-                    chunk_type=chunk_type,
-                )
-            )
-
-            last_end = end + 1
-
-        # Add remaining code
-        if last_end < len(lines):
-            module_content = "\n".join(lines[last_end:])
-            if module_content.strip():
-                chunks.append(
-                    self._create_chunk(
-                        content=module_content,
-                        file_path=file_path,
-                        start_line=last_end,
-                        end_line=len(lines) - 1,
-                        chunk_type="module",
-                    )
-                )
-
-        return chunks if chunks else self._chunk_generic(content, file_path)
-
-    def _find_js_block_end(self, lines: List[str], start_line: int) -> int:
-        """Find end of JavaScript block using brace counting"""
-        brace_count = 0
-        in_block = False
-
-        for i in range(start_line, len(lines)):
-            line = lines[i]
-            for char in line:
-                if char == "{":
-                    brace_count += 1
-                    in_block = True
-                elif char == "}":
-                    brace_count -= 1
-                    if in_block and brace_count == 0:
-                        return i
-
-        return len(lines) - 1
-
-    def _chunk_golang(self, content: str, file_path: str) -> List[Dict[str, Any]]:
-        """Chunk Go code by functions and structs"""
-        chunks = []
-        lines = content.split("\n")
-
-        # Find function and struct boundaries
-        boundaries = []
-        for i, line in enumerate(lines):
-            if re.match(r"^\s*func\s+", line) or re.match(
-                r"^\s*type\s+\w+\s+(?:struct|interface)", line
-            ):
-                boundaries.append(i)
-
-        last_end = 0
-        for start in boundaries:
-            # Add code before this function/struct
-            if start > last_end:
-                module_content = "\n".join(lines[last_end:start])
-                if module_content.strip():
-                    chunks.append(
-                        self._create_chunk(
-                            content=module_content,
-                            file_path=file_path,
-                            start_line=last_end,
-                            end_line=start - 1,
-                            chunk_type="module",
-                        )
-                    )
-
-            # Find end of function/struct
-            end = self._find_go_block_end(lines, start)
-            chunk_content = "\n".join(lines[start : end + 1])
-
-            # Determine chunk type
-            chunk_type = "function"
-            if "type" in lines[start] and (
-                "struct" in lines[start] or "interface" in lines[start]
-            ):
-                chunk_type = "type"
-
-            chunks.append(
-                self._create_chunk(
-                    content=chunk_content,
-                    file_path=file_path,
-                    start_line=start,
-                    end_line=end,
-                    chunk_type=chunk_type,
-                )
-            )
-
-            last_end = end + 1
-
-        # Add remaining code
-        if last_end < len(lines):
-            module_content = "\n".join(lines[last_end:])
-            if module_content.strip():
-                chunks.append(
-                    self._create_chunk(
-                        content=module_content,
-                        file_path=file_path,
-                        start_line=last_end,
-                        end_line=len(lines) - 1,
-                        chunk_type="module",
-                    )
-                )
-
-        return chunks if chunks else self._chunk_generic(content, file_path)
-
-    def _find_go_block_end(self, lines: List[str], start_line: int) -> int:
-        """Find end of Go function or struct block"""
-        brace_count = 0
-        in_block = False
-
-        for i in range(start_line, len(lines)):
-            line = lines[i]
-            for char in line:
-                if char == "{":
-                    brace_count += 1
-                    in_block = True
-                elif char == "}":
-                    brace_count -= 1
-                    if in_block and brace_count == 0:
-                        return i
-
-        return len(lines) - 1
-
-    def _chunk_html(self, content: str, file_path: str) -> List[Dict[str, Any]]:
-        """Chunk HTML by components and sections"""
-        chunks = []
-        lines = content.split("\n")
-
-        # Find major HTML sections
-        section_patterns = [
-            r"<(head|body|header|nav|main|section|article|aside|footer|div\s+(?:class|id))",
-            r"<script",
-            r"<style",
-        ]
-
-        boundaries = []
-        for i, line in enumerate(lines):
-            for pattern in section_patterns:
-                if re.search(pattern, line, re.IGNORECASE):
-                    boundaries.append(i)
-                    break
-
-        # If no major sections found, chunk by size
-        if not boundaries:
-            return self._chunk_generic(content, file_path)
-
-        last_end = 0
-        for start in boundaries:
-            if start > last_end:
-                # Add content before this section
-                section_content = "\n".join(lines[last_end:start])
-                if section_content.strip():
-                    chunks.append(
-                        self._create_chunk(
-                            content=section_content,
-                            file_path=file_path,
-                            start_line=last_end,
-                            end_line=start - 1,
-                            chunk_type="html_section",
-                        )
-                    )
-
-            # Find end of this section
-            end = self._find_html_section_end(lines, start)
-            chunk_content = "\n".join(lines[start : end + 1])
-
-            chunks.append(
-                self._create_chunk(
-                    content=chunk_content,
-                    file_path=file_path,
-                    start_line=start,
-                    end_line=end,
-                    chunk_type="html_section",
-                )
-            )
-
-            last_end = end + 1
-
-        # Add remaining content
-        if last_end < len(lines):
-            remaining_content = "\n".join(lines[last_end:])
-            if remaining_content.strip():
-                chunks.append(
-                    self._create_chunk(
-                        content=remaining_content,
-                        file_path=file_path,
-                        start_line=last_end,
-                        end_line=len(lines) - 1,
-                        chunk_type="html_section",
-                    )
-                )
-
-        return chunks
-
-    def _find_html_section_end(self, lines: List[str], start_line: int) -> int:
-        """Find end of HTML section"""
-        # Simple approach: look for closing tag or next major section
-        start_line_content = lines[start_line]
-
-        # Extract tag name
-        tag_match = re.search(r"<(\w+)", start_line_content)
-        if tag_match:
-            tag_name = tag_match.group(1)
-            closing_tag = f"</{tag_name}>"
-
-            for i in range(start_line + 1, len(lines)):
-                if closing_tag in lines[i]:
-                    return i
-
-        # Fallback: next 20 lines or next major section
-        for i in range(start_line + 1, min(start_line + 21, len(lines))):
-            if re.search(
-                r"<(?:head|body|header|nav|main|section|article|aside|footer)",
-                lines[i],
-                re.IGNORECASE,
-            ):
-                return i - 1
 
-        return min(start_line + 20, len(lines) - 1)
-
-    def _chunk_css(self, content: str, file_path: str) -> List[Dict[str, Any]]:
-        """Chunk CSS by selectors and rules"""
-        chunks = []
-        lines = content.split("\n")
-
-        # Find CSS rules and blocks
-        rule_starts = []
-        for i, line in enumerate(lines):
-            # Look for CSS selectors
-            if re.match(r"^\s*[.#]?[\w-]+(?:\s*[,.:]|\s*\{)", line.strip()) or re.match(
-                r"^\s*@", line.strip()
-            ):
-                rule_starts.append(i)
-
-        if not rule_starts:
-            return self._chunk_generic(content, file_path)
-
-        last_end = 0
-        for start in rule_starts:
-            if start > last_end:
-                # Add content before this rule
-                section_content = "\n".join(lines[last_end:start])
-                if section_content.strip():
-                    chunks.append(
-                        self._create_chunk(
-                            content=section_content,
-                            file_path=file_path,
-                            start_line=last_end,
-                            end_line=start - 1,
-                            chunk_type="css_block",
-                        )
-                    )
-
-            # Find end of this CSS rule
-            end = self._find_css_rule_end(lines, start)
-            chunk_content = "\n".join(lines[start : end + 1])
-
-            chunks.append(
-                self._create_chunk(
-                    content=chunk_content,
-                    file_path=file_path,
-                    start_line=start,
-                    end_line=end,
-                    chunk_type="css_rule",
-                )
-            )
-
-            last_end = end + 1
-
-        # Add remaining content
-        if last_end < len(lines):
-            remaining_content = "\n".join(lines[last_end:])
-            if remaining_content.strip():
-                chunks.append(
-                    self._create_chunk(
-                        content=remaining_content,
-                        file_path=file_path,
-                        start_line=last_end,
-                        end_line=len(lines) - 1,
-                        chunk_type="css_block",
-                    )
-                )
-
-        return chunks
-
-    def _find_css_rule_end(self, lines: List[str], start_line: int) -> int:
-        """Find end of CSS rule"""
-        brace_count = 0
-
-        for i in range(start_line, len(lines)):
-            line = lines[i]
-            for char in line:
-                if char == "{":
-                    brace_count += 1
-                elif char == "}":
-                    brace_count -= 1
-                    if brace_count == 0:
-                        return i
-
-        return len(lines) - 1
-
-    def _chunk_generic(self, content: str, file_path: str) -> List[Dict[str, Any]]:
-        """Generic chunking for any file type"""
-        chunks = []
-        lines = content.split("\n")
-
-        # Simple sliding window approach
-        chunk_size = min(50, len(lines))  # 50 lines per chunk
-        overlap = 5  # 5 lines overlap
-
-        for i in range(0, len(lines), chunk_size - overlap):
-            end = min(i + chunk_size, len(lines))
-            chunk_content = "\n".join(lines[i:end])
-
-            if chunk_content.strip():
-                chunks.append(
-                    self._create_chunk(
-                        content=chunk_content,
-                        file_path=file_path,
-                        start_line=i,
-                        end_line=end - 1,
-                        chunk_type="block",
-                    )
-                )
-
-        return chunks
-
-    def _generate_description(
-        self, content: str, file_path: str, chunk_type: str, analysis: Dict[str, Any]
-    ) -> str:
-        """Generate natural language description of code chunk"""
-        descriptions = []
-
-        # File context
-        filename = Path(file_path).name
-        descriptions.append(f"Code from {filename}")
-
-        # Type and functions
-        if chunk_type == "function" and analysis["functions"]:
-            descriptions.append(
-                f"containing function(s): {', '.join(analysis['functions'][:3])}"
-            )
-        elif chunk_type == "class" and analysis["classes"]:
-            descriptions.append(
-                f"containing class(es): {', '.join(analysis['classes'][:3])}"
-            )
-        elif chunk_type == "type" and analysis["classes"]:
-            descriptions.append(
-                f"containing type(s): {', '.join(analysis['classes'][:3])}"
-            )
-        elif chunk_type == "module":
-            descriptions.append("module-level code")
-        elif chunk_type == "html_section":
-            descriptions.append("HTML section")
-        elif chunk_type == "css_rule":
-            descriptions.append("CSS rule")
-
-        # UI components
-        if analysis.get("ui_components"):
-            descriptions.append(
-                f"UI components: {', '.join(analysis['ui_components'][:3])}"
-            )
-
-        # Imports
-        if analysis["imports"]:
-            descriptions.append(f"imports: {', '.join(analysis['imports'][:3])}")
-
-        # Language
-        descriptions.append(f"in {analysis['language']}")
+def _file_digest(file_path: Path) -> Optional[str]:
+    """Content hash of a project file, None when it cannot be read"""
+    try:
+        return hashlib.blake2b(file_path.read_bytes(), digest_size=16).hexdigest()
+    except OSError:
+        return None
 
-        # Content preview
-        content_preview = content.strip()[:100].replace("\n", " ")
-        if len(content.strip()) > 100:
-            content_preview += "..."
-        descriptions.append(f"Content: {content_preview}")
 
-        return ". ".join(descriptions)
+def _files_digest(project_files: List[Tuple[Path, os.stat_result]]) -> str:
+    """Hash of the paths of a ``_scan_project`` result, in any order"""
+    digest = hashlib.blake2b(digest_size=16)
+    for file_path in sorted(str(file_path) for file_path, _ in project_files):
+        digest.update(file_path.encode("utf-8", "surrogateescape"))
+        digest.update(b"\0")
+    return digest.hexdigest()
 
 
 class RAGSystem:
     """Enhanced RAG system with smart multi-file context retrieval"""
 
-    def __init__(self, project_path: str, cache_dir: str = ".rag_cache"):
+    def __init__(
+        self,
+        project_path: str,
+        cache_dir: str = ".rag_cache",
+        embedder: Optional[SentenceTransformer] = None,
+    ):
         self.project_path = Path(project_path)
         self.cache_dir = Path(cache_dir)
         self.cache_dir.mkdir(exist_ok=True)
 
         # Initialize components
         self.chunker = CodeChunker()
-        self.embedder = SentenceTransformer("all-MiniLM-L6-v2")
+        self.embedding_model_name = "all-MiniLM-L6-v2"
+        # Projects share one copy of the model unless given their own
+        self.embedder = (
+            embedder
+            if embedder is not None
+            else _shared_embedder(self.embedding_model_name)
+        )
+        self.embed_batch_size = 64
+        # Chunk files in worker processes once a project has this many of them
+        self.parallel_min_files = 32
+        self.index_workers = min(_MAX_INDEX_WORKERS, os.cpu_count() or 1)
+        # Above this many chunks, use an approximate HNSW index instead of a flat scan
+        self.hnsw_min_chunks = 10000
         self.chunks: Dict[str, CodeChunk] = {}
-        self.index: Optional[faiss.IndexFlatIP] = None
+        self.index: Optional[faiss.Index] = None
         self.chunk_ids: List[str] = []
+        # Chunks by FAISS row, so search hits skip the chunk_id -> chunk lookup
+        self.indexed_chunks: List[CodeChunk] = []
+        # Recent smart-context answers, reused for queries whose embedding is
+        # this close to a cached one; entries are (stored at, query vector,
+        # gate, file mtimes, result) and only answer a query with an
+        # identical gate while none of the files in the answer changed.
+        # Requests share the instance, so the list is guarded by a lock
+        self.semantic_cache_size = 256
+        self.semantic_cache_threshold = 0.95
+        self.semantic_cache_ttl = 300.0
+        self._semantic_cache: List[
+            Tuple[float, np.ndarray, Tuple, Dict[str, int], Dict[str, Any]]
+        ] = []
+        self._semantic_cache_lock = threading.Lock()
 
         # New: dependency analyzer
         self.dependency_analyzer = FileDependencyAnalyzer()
@@ -1192,6 +504,8 @@ class RAGSystem:
         self.index_cache_file = self.cache_dir / "index.faiss"
         self.metadata_cache_file = self.cache_dir / "metadata.json"
         self.dependency_cache_file = self.cache_dir / "dependencies.pkl"
+        self.embedding_cache_file = self.cache_dir / "embeddings.pkl"
+        self.chunk_embeddings_file = self.cache_dir / "chunk_embeddings.npy"
 
         # Load existing cache if available
         self._load_cache()
@@ -1209,21 +523,32 @@ class RAGSystem:
                 with open(self.metadata_cache_file, "r") as f:
                     metadata = json.load(f)
 
-                # Simple cache invalidation based on project modification time
+                # Simple cache invalidation based on project modification time,
+                # plus the set of files, which deletes and renames change
+                project_files = self._scan_project()
                 project_mtime = max(
-                    os.path.getmtime(f)
-                    for f in self.project_path.rglob("*")
-                    if f.is_file() and not self._should_ignore_file(f)
+                    file_stat.st_mtime for _, file_stat in project_files
                 )
 
-                if metadata.get("project_mtime", 0) >= project_mtime:
-                    # Load chunks
+                same_files = metadata.get("files_digest") == _files_digest(
+                    project_files
+                )
+                if same_files and metadata.get("project_mtime", 0) >= project_mtime:
+                    # Load chunks, their embeddings memory-mapped from disk
                     with open(self.chunks_cache_file, "rb") as f:
                         self.chunks = pickle.load(f)
+                    if self.chunk_embeddings_file.exists():
+                        embeddings = np.load(self.chunk_embeddings_file, mmap_mode="r")
+                        if len(embeddings) == len(self.chunks):
+                            for chunk, embedding in zip(
+                                self.chunks.values(), embeddings
+                            ):
+                                chunk.embedding = embedding
 
                     # Load index
                     self.index = faiss.read_index(str(self.index_cache_file))
                     self.chunk_ids = metadata["chunk_ids"]
+                    self._freeze_chunks()
 
                     # Load dependency analyzer
                     if self.dependency_cache_file.exists():
@@ -1237,12 +562,37 @@ class RAGSystem:
 
         return False
 
-    def _save_cache(self):
-        """Save index and chunks to cache"""
+    def _save_cache(
+        self,
+        project_files: Optional[List[Tuple[Path, os.stat_result]]] = None,
+        file_hashes: Optional[Dict[str, str]] = None,
+    ):
+        """Save index and chunks to cache
+
+        ``project_files`` is the ``_scan_project`` result the index was built
+        from; the project is scanned again when it is not given.
+        ``file_hashes`` maps each indexed file to its content hash, so the
+        next index run can reuse the chunks of files that did not change.
+        """
         try:
-            # Save chunks
+            # Save chunk metadata, with the embeddings as one matrix beside it
+            chunks = list(self.chunks.values())
             with open(self.chunks_cache_file, "wb") as f:
-                pickle.dump(self.chunks, f)
+                pickle.dump(
+                    {
+                        chunk.chunk_id: replace(chunk, embedding=None)
+                        for chunk in chunks
+                    },
+                    f,
+                    protocol=pickle.HIGHEST_PROTOCOL,
+                )
+            if chunks and all(chunk.embedding is not None for chunk in chunks):
+                np.save(
+                    self.chunk_embeddings_file,
+                    np.stack([chunk.embedding for chunk in chunks]),
+                )
+            elif self.chunk_embeddings_file.exists():
+                self.chunk_embeddings_file.unlink()
 
             # Save index
             if self.index:
@@ -1250,18 +600,20 @@ class RAGSystem:
 
             # Save dependency analyzer
             with open(self.dependency_cache_file, "wb") as f:
-                pickle.dump(self.dependency_analyzer, f)
+                pickle.dump(
+                    self.dependency_analyzer, f, protocol=pickle.HIGHEST_PROTOCOL
+                )
 
             # Save metadata
-            project_mtime = max(
-                os.path.getmtime(f)
-                for f in self.project_path.rglob("*")
-                if f.is_file() and not self._should_ignore_file(f)
-            )
+            if project_files is None:
+                project_files = self._scan_project()
+            project_mtime = max(file_stat.st_mtime for _, file_stat in project_files)
 
             metadata = {
                 "project_mtime": project_mtime,
+                "files_digest": _files_digest(project_files),
                 "chunk_ids": self.chunk_ids,
+                "file_hashes": file_hashes or {},
                 "created_at": datetime.now().isoformat(),
             }
 
@@ -1272,66 +624,124 @@ class RAGSystem:
         except Exception as e:
             logger.error(f"Failed to save cache: {e}")
 
+    def _reusable_file_chunks(
+        self, file_hashes: Dict[str, str]
+    ) -> Dict[str, List[CodeChunk]]:
+        """Cached chunks of every file whose content hash is unchanged
+
+        Chunks are grouped by file in index order. Files missing from the
+        result have changed, are new, or the cache could not be read.
+        """
+        try:
+            if not (
+                self.chunks_cache_file.exists() and self.metadata_cache_file.exists()
+            ):
+                return {}
+
+            with open(self.metadata_cache_file, "r") as f:
+                metadata = json.load(f)
+            reusable = {
+                file_path: []
+                for file_path, digest in metadata.get("file_hashes", {}).items()
+                if file_hashes.get(file_path) == digest
+            }
+            if not reusable:
+                return {}
+
+            with open(self.chunks_cache_file, "rb") as f:
+                chunks = pickle.load(f)
+            for chunk_id in metadata["chunk_ids"]:
+                chunk = chunks[chunk_id]
+                if chunk.file_path in reusable:
+                    # The dependency analysis fills these in again
+                    chunk.exported_symbols = []
+                    reusable[chunk.file_path].append(chunk)
+            return reusable
+        except Exception as e:
+            logger.warning(f"Failed to load cached chunks: {e}")
+            return {}
+
+    def _freeze_chunks(self):
+        """Line the chunks up with the rows of the FAISS index"""
+        self.indexed_chunks = [self.chunks[chunk_id] for chunk_id in self.chunk_ids]
+
+    def _embedding_key(self, chunk: CodeChunk) -> str:
+        """Cache key for the normalized embedding of ``chunk`` and current model
+
+        Hashes the description and content piecewise, so the text actually
+        embedded only has to be joined for chunks missing from the cache.
+        """
+        digest = hashlib.sha256(
+            f"{self.embedding_model_name}:normalized\n".encode("utf-8")
+        )
+        digest.update(chunk.description.encode("utf-8"))
+        digest.update(b"\n\n")
+        digest.update(chunk.content.encode("utf-8"))
+        return digest.hexdigest()
+
+    def _load_embedding_cache(self) -> Dict[str, np.ndarray]:
+        """Load embeddings cached by content hash from a previous index run"""
+        try:
+            if self.embedding_cache_file.exists():
+                with open(self.embedding_cache_file, "rb") as f:
+                    return pickle.load(f)
+        except Exception as e:
+            logger.warning(f"Failed to load embedding cache: {e}")
+        return {}
+
+    def _save_embedding_cache(self, embeddings: Dict[str, np.ndarray]):
+        """Save embeddings keyed by content hash for the next index run"""
+        try:
+            with open(self.embedding_cache_file, "wb") as f:
+                pickle.dump(embeddings, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.error(f"Failed to save embedding cache: {e}")
+
+    def _scan_project(self) -> List[Tuple[Path, os.stat_result]]:
+        """Every file of the project that is not ignored, with its stat
+
+        Each path is stat()ed once, and the result serves both the size
+        check and the modification times the cache is validated against.
+        """
+        project_files = []
+        for root, dirs, files in os.walk(self.project_path):
+            # Prune ignored directories so the walk never enters them
+            dirs[:] = [name for name in dirs if name not in _IGNORE_DIRS]
+            root_path = Path(root)
+            for name in files:
+                if _is_ignored_file_name(name):
+                    continue
+                file_path = root_path / name
+                try:
+                    file_stat = file_path.stat()
+                except OSError:
+                    continue
+                if (
+                    stat.S_ISREG(file_stat.st_mode)
+                    and file_stat.st_size <= _MAX_INDEXED_FILE_SIZE
+                ):
+                    project_files.append((file_path, file_stat))
+        return project_files
+
     def _should_ignore_file(self, file_path: Path) -> bool:
         """Check if file should be ignored"""
-        ignore_dirs = {
-            ".git",
-            "__pycache__",
-            ".vscode",
-            ".idea",
-            "node_modules",
-            "venv",
-            ".env",
-            "build",
-            "dist",
-            ".rag_cache",
-            "vendor",  # Go vendor directory
-            "target",  # Rust target directory
-            ".next",  # Next.js build directory
-            "coverage",  # Test coverage directories
-        }
-        ignore_files = {
-            ".DS_Store",
-            ".gitignore",
-            "package-lock.json",
-            "yarn.lock",
-            "go.sum",
-        }
-        ignore_extensions = {
-            ".pyc",
-            ".log",
-            ".swp",
-            ".swo",
-            ".tmp",
-            ".bak",
-            ".min.js",
-            ".min.css",  # Minified files
-            ".map",  # Source maps
-            ".lock",  # Lock files
-        }
+        return (
+            self._ignored_by_name(file_path)
+            or file_path.stat().st_size > _MAX_INDEXED_FILE_SIZE
+        )
 
+    def _ignored_by_name(self, file_path: Path) -> bool:
+        """Check if file should be ignored by its name and directories alone"""
         # Check if any parent directory is in ignore list
-        for parent in file_path.parents:
-            if parent.name in ignore_dirs:
-                return True
-
-        # Check filename and extension
-        if (
-            file_path.name in ignore_files
-            or file_path.suffix in ignore_extensions
-            or file_path.name.startswith(".")
-            or file_path.stat().st_size > 1024 * 1024  # Skip files larger than 1MB
-        ):
+        if not _IGNORE_DIRS.isdisjoint(file_path.parts[:-1]):
             return True
 
-        return False
+        return _is_ignored_file_name(file_path.name)
 
     def index_project(self) -> int:
         """Index the entire project"""
         logger.info(f"Indexing project: {self.project_path}")
 
-        all_chunks = []
-
         # Supported file extensions
         supported_extensions = {
             ".py",
@@ -1354,138 +764,233 @@ class RAGSystem:
         }
 
         # Process all files
-        for file_path in self.project_path.rglob("*"):
-            if (
-                file_path.is_file()
-                and not self._should_ignore_file(file_path)
-                and file_path.suffix.lower() in supported_extensions
-            ):
+        project_files = self._scan_project()
+        files = [
+            (file_path, str(file_path.relative_to(self.project_path)))
+            for file_path, _ in project_files
+            if file_path.suffix.lower() in supported_extensions
+        ]
+
+        # Files unchanged since the cached index keep their chunks as they are
+        file_hashes = {}
+        for file_path, relative_path in files:
+            digest = _file_digest(file_path)
+            if digest is not None:
+                file_hashes[relative_path] = digest
+        reused = self._reusable_file_chunks(file_hashes)
+        changed_files = [
+            (file_path, relative_path)
+            for file_path, relative_path in files
+            if relative_path not in reused
+        ]
+        logger.info(
+            f"Reusing chunks of {len(reused)} unchanged files, "
+            f"chunking {len(changed_files)}"
+        )
+
+        # Parsing and analysis are CPU bound, so spread them over processes
+        file_chunks: Dict[str, List[Dict[str, Any]]] = {}
+        if self.index_workers > 1 and len(changed_files) >= self.parallel_min_files:
+            with ProcessPoolExecutor(
+                max_workers=min(self.index_workers, len(changed_files)),
+                mp_context=_INDEX_POOL_CONTEXT,
+            ) as pool:
+                futures = [
+                    pool.submit(_chunk_file, self.chunker, file_path, relative_path)
+                    for file_path, relative_path in changed_files
+                ]
+                for (file_path, relative_path), future in zip(changed_files, futures):
+                    try:
+                        file_chunks[relative_path] = future.result()
+                    except Exception as e:
+                        logger.warning(f"Failed to process {file_path}: {e}")
+        else:
+            for file_path, relative_path in changed_files:
                 try:
-                    content = file_path.read_text(encoding="utf-8", errors="ignore")
-                    if content.strip():  # Skip empty files
-                        relative_path = str(file_path.relative_to(self.project_path))
-                        chunks = self.chunker.chunk_by_functions(content, relative_path)
-                        all_chunks.extend(chunks)
+                    file_chunks[relative_path] = _chunk_file(
+                        self.chunker, file_path, relative_path
+                    )
                 except Exception as e:
                     logger.warning(f"Failed to process {file_path}: {e}")
 
         # Create CodeChunk objects and generate embeddings
+        self._clear_semantic_cache()
         self.chunks = {}
-        embeddings = []
         self.chunk_ids = []
+        new_chunks = []
+
+        for file_path, relative_path in files:
+            if relative_path in reused:
+                new_chunks.extend(reused[relative_path])
+                continue
+            if relative_path not in file_chunks:
+                # Failed files are retried on the next run
+                file_hashes.pop(relative_path, None)
+                continue
+
+            for chunk_data in file_chunks[relative_path]:
+                try:
+                    # Create CodeChunk object with proper dependencies initialization
+                    chunk = CodeChunk(
+                        content=chunk_data["content"],
+                        file_path=chunk_data["file_path"],
+                        chunk_id=chunk_data["chunk_id"],
+                        start_line=chunk_data["start_line"],
+                        end_line=chunk_data["end_line"],
+                        chunk_type=chunk_data["chunk_type"],
+                        language=chunk_data["language"],
+                        description=chunk_data["description"],
+                        functions=chunk_data.get("functions", []),
+                        classes=chunk_data.get("classes", []),
+                        imports=chunk_data.get("imports", []),
+                        dependencies=chunk_data.get("dependencies", []),
+                        complexity_score=chunk_data.get("complexity_score", 0.0),
+                        exported_symbols=chunk_data.get("exported_symbols", []),
+                        imported_from=chunk_data.get("imported_from", {}),
+                        ui_components=chunk_data.get("ui_components", []),
+                        css_classes=chunk_data.get("css_classes", []),
+                        dom_ids=chunk_data.get("dom_ids", []),
+                    )
+
+                    new_chunks.append(chunk)
+
+                except Exception as e:
+                    logger.warning(f"Failed to create chunk: {e}")
+                    continue
+
+        logger.info(f"Generating embeddings for {len(new_chunks)} chunks...")
+
+        # Embed content + description, reusing vectors for unchanged chunks
+        if new_chunks:
+            keys = [self._embedding_key(chunk) for chunk in new_chunks]
+            cached = self._load_embedding_cache()
+            pending = {
+                key: f"{chunk.description}\n\n{chunk.content}"
+                for key, chunk in zip(keys, new_chunks)
+                if key not in cached
+            }
+            logger.info(
+                f"Reusing {len(keys) - len(pending)} cached embeddings, "
+                f"encoding {len(pending)}"
+            )
 
-        logger.info(f"Generating embeddings for {len(all_chunks)} chunks...")
-
-        for chunk_data in all_chunks:
-            try:
-                # Create CodeChunk object with proper dependencies initialization
-                chunk = CodeChunk(
-                    content=chunk_data["content"],
-                    file_path=chunk_data["file_path"],
-                    chunk_id=chunk_data["chunk_id"],
-                    start_line=chunk_data["start_line"],
-                    end_line=chunk_data["end_line"],
-                    chunk_type=chunk_data["chunk_type"],
-                    language=chunk_data["language"],
-                    description=chunk_data["description"],
-                    functions=chunk_data.get("functions", []),
-                    classes=chunk_data.get("classes", []),
-                    imports=chunk_data.get("imports", []),
-                    dependencies=chunk_data.get("dependencies", []),
-                    complexity_score=chunk_data.get("complexity_score", 0.0),
-                    exported_symbols=chunk_data.get("exported_symbols", []),
-                    imported_from=chunk_data.get("imported_from", {}),
-                    ui_components=chunk_data.get("ui_components", []),
-                    css_classes=chunk_data.get("css_classes", []),
-                    dom_ids=chunk_data.get("dom_ids", []),
+            if pending:
+                encoded = self.embedder.encode(
+                    list(pending.values()),
+                    batch_size=self.embed_batch_size,
+                    convert_to_numpy=True,
+                    normalize_embeddings=True,
+                    show_progress_bar=False,
                 )
+                cached.update(zip(pending.keys(), encoded))
 
-                # Generate embedding for content + description
-                text_to_embed = f"{chunk.description}\n\n{chunk.content}"
-                embedding = self.embedder.encode(text_to_embed, convert_to_numpy=True)
-                chunk.embedding = embedding
+            embeddings = np.vstack([cached[key] for key in keys])
+            # Keep only the vectors of the current chunks so the cache stays bounded
+            self._save_embedding_cache({key: cached[key] for key in keys})
+
+            for chunk, embedding in zip(new_chunks, embeddings):
+                # Half precision is plenty for the stored copy, as for the index
+                chunk.embedding = embedding.astype(np.float16)
 
                 # Store
                 self.chunks[chunk.chunk_id] = chunk
-                embeddings.append(embedding)
                 self.chunk_ids.append(chunk.chunk_id)
 
-            except Exception as e:
-                logger.warning(f"Failed to create chunk: {e}")
-                continue
+            # Create FAISS index
+            embeddings_matrix = embeddings.astype("float32")
 
-        # Create FAISS index
-        if embeddings:
-            embeddings_matrix = np.vstack(embeddings).astype("float32")
-            # Normalize for cosine similarity
-            faiss.normalize_L2(embeddings_matrix)
-
-            # Create index
+            # Create index, inner product on unit vectors for cosine similarity.
+            # Vectors are stored as float16, which halves the index and
+            # leaves the ranking of normalized embeddings practically unchanged
             dimension = embeddings_matrix.shape[1]
-            self.index = faiss.IndexFlatIP(
-                dimension
-            )  # Inner product for cosine similarity
+            if len(embeddings_matrix) >= self.hnsw_min_chunks:
+                self.index = faiss.IndexHNSWSQ(
+                    dimension,
+                    faiss.ScalarQuantizer.QT_fp16,
+                    32,
+                    faiss.METRIC_INNER_PRODUCT,
+                )
+                self.index.hnsw.efConstruction = 200
+                self.index.hnsw.efSearch = 128
+            else:
+                self.index = faiss.IndexScalarQuantizer(
+                    dimension,
+                    faiss.ScalarQuantizer.QT_fp16,
+                    faiss.METRIC_INNER_PRODUCT,
+                )
+            # fp16 needs no statistics, but the quantizer still wants training
+            self.index.train(embeddings_matrix)
             self.index.add(embeddings_matrix)
 
-            logger.info(f"Created FAISS index with {len(embeddings)} chunks")
+            logger.info(f"Created FAISS index with {len(new_chunks)} chunks")
+
+        self._freeze_chunks()
 
         # Analyze dependencies
         logger.info("Analyzing file dependencies...")
         self.dependency_analyzer.analyze_project(self.chunks)
 
         # Save to cache
-        self._save_cache()
+        self._save_cache(project_files, file_hashes)
 
-        return len(all_chunks)
+        return len(new_chunks)
 
     def search(
         self, query: str, k: int = 10, current_file: Optional[str] = None
     ) -> List[CodeChunk]:
         """Search for relevant code chunks"""
+        return self._search_embedding(self._embed_query(query), k, current_file)
+
+    def _embed_query(self, query: str) -> np.ndarray:
+        """Normalized float32 embedding of a search query"""
+        return self.embedder.encode(
+            query, convert_to_numpy=True, normalize_embeddings=True
+        ).astype("float32")
+
+    def _search_embedding(
+        self, query_embedding: np.ndarray, k: int, current_file: Optional[str]
+    ) -> List[CodeChunk]:
+        """search() for an already embedded query"""
         if not self.index or not self.chunks:
             logger.warning("No index available. Please index the project first.")
             return []
 
-        # Generate query embedding
-        query_embedding = self.embedder.encode(query, convert_to_numpy=True).astype(
-            "float32"
-        )
         query_embedding = query_embedding.reshape(1, -1)
-        faiss.normalize_L2(query_embedding)
 
         # Search
-        scores, indices = self.index.search(
-            query_embedding,
-            min(k * 3, len(self.chunk_ids)),  # Get more results for filtering
-        )
+        fetch_k = min(k * 3, len(self.chunk_ids))  # Get more results for filtering
+        if hasattr(self.index, "hnsw"):
+            # The HNSW beam has to be at least as wide as the results wanted
+            self.index.hnsw.efSearch = max(128, fetch_k)
+        scores, indices = self.index.search(query_embedding, fetch_k)
 
         results = []
-        seen_files = set()
         file_chunk_count = {}
+        boosted = False
 
         for score, idx in zip(scores[0], indices[0]):
-            if idx < len(self.chunk_ids):
-                chunk_id = self.chunk_ids[idx]
-                chunk = self.chunks[chunk_id]
-
-                # Boost score if from current file
-                adjusted_score = score
-                if current_file and chunk.file_path == current_file:
-                    adjusted_score *= 1.5
+            if 0 <= idx < len(self.indexed_chunks):
+                chunk = self.indexed_chunks[idx]
 
                 # Limit chunks per file to avoid overwhelming from single file
                 file_count = file_chunk_count.get(chunk.file_path, 0)
                 if file_count < 3:  # Max 3 chunks per file initially
+                    # Boost score if from current file
+                    adjusted_score = score
+                    if current_file and chunk.file_path == current_file:
+                        adjusted_score *= 1.5
+                        boosted = True
                     results.append((chunk, adjusted_score))
                     file_chunk_count[chunk.file_path] = file_count + 1
-                    seen_files.add(chunk.file_path)
 
                 if len(results) >= k:
                     break
 
-        # Sort by adjusted score and return top k
-        results.sort(key=lambda x: x[1], reverse=True)
-        return [chunk for chunk, _ in results[:k]]
+        # The index hands back results best first, so only a current-file
+        # boost can change their order
+        if boosted:
+            results.sort(key=lambda x: x[1], reverse=True)
+        return [chunk for chunk, _ in results]
 
     def get_relevant_context_smart(
         self,
@@ -1497,32 +1002,32 @@ class RAGSystem:
         """Enhanced context retrieval with smart file detection"""
 
         # Analyze query to determine if UI changes are involved
-        is_ui_query = any(
-            term in user_query.lower()
-            for term in [
-                "ui",
-                "interface",
-                "button",
-                "component",
-                "style",
-                "css",
-                "layout",
-                "design",
-                "visual",
-                "appearance",
-                "top bar",
-                "appbar",
-                "navbar",
-                "header",
-                "footer",
-                "sidebar",
-                "modal",
-                "dialog",
-            ]
+        query_lower = user_query.lower()
+        is_ui_query = _RE_QUERY_UI.search(query_lower) is not None
+        # If the query mentions editing/changing/improving, include full files
+        is_edit_query = _RE_QUERY_EDIT.search(query_lower) is not None
+
+        # A near-identical query asked for the same kind of context before
+        # gets the same answer
+        query_embedding = self._embed_query(user_query)
+        cache_gate = (
+            current_file,
+            max_tokens,
+            include_full_files,
+            is_ui_query,
+            is_edit_query,
         )
+        cached = self._semantic_cache_lookup(query_embedding, cache_gate)
+        if cached is not None:
+            return {
+                **cached,
+                "rag_metadata": {**cached["rag_metadata"], "search_query": user_query},
+            }
 
         # Get relevant chunks from search
-        relevant_chunks = self.search(user_query, k=15, current_file=current_file)
+        relevant_chunks = self._search_embedding(
+            query_embedding, k=15, current_file=current_file
+        )
 
         # Collect files that need full content
         files_for_full_content = set()
@@ -1532,23 +1037,7 @@ class RAGSystem:
         for chunk in relevant_chunks:
             file_path = chunk.file_path
 
-            # If the query mentions editing/changing/improving, include full file
-            if any(
-                action in user_query.lower()
-                for action in [
-                    "edit",
-                    "change",
-                    "modify",
-                    "update",
-                    "improve",
-                    "fix",
-                    "refactor",
-                    "rewrite",
-                    "adjust",
-                    "make",
-                    "set",
-                ]
-            ):
+            if is_edit_query:
                 # This file likely needs editing
                 files_for_full_content.add(file_path)
             else:
@@ -1568,12 +1057,12 @@ class RAGSystem:
             # Get CSS/style files related to the components
             for chunk in relevant_chunks:
                 if chunk.css_classes:
-                    # Find CSS files that might contain these classes
-                    for other_chunk in self.chunks.values():
-                        if other_chunk.language == "css" and any(
-                            cls in other_chunk.content for cls in chunk.css_classes
-                        ):
-                            files_for_chunks.add(other_chunk.file_path)
+                    # Find CSS files that define these classes
+                    files_for_chunks.update(
+                        self.dependency_analyzer.get_css_related_files(
+                            chunk.css_classes
+                        )
+                    )
 
         # Add dependency files
         for file_path in list(files_for_full_content):
@@ -1631,6 +1120,7 @@ class RAGSystem:
                         "classes": chunk.classes,
                         "language": chunk.language,
                         "ui_components": chunk.ui_components,
+                        "header": chunk.header,
                     }
                 )
 
@@ -1645,15 +1135,16 @@ class RAGSystem:
 
         # Add chunked files
         for file_path, chunks in chunk_contents.items():
+            # Headers and contents go in as separate parts, joined only once
             content_parts = [
                 f"[PARTIAL CONTEXT - Read-only, request full file to edit]"
             ]
             for chunk_info in chunks:
-                header = f"\n# {chunk_info['chunk_type'].upper()} ({chunk_info['start_line']}-{chunk_info['end_line']}): {chunk_info['description']}\n"
-                content_parts.append(header + chunk_info["content"])
-            all_file_contents[file_path] = "\n".join(content_parts)
+                content_parts.append(chunk_info["header"])
+                content_parts.append(chunk_info["content"])
+            all_file_contents[file_path] = "".join(content_parts)
 
-        return {
+        result = {
             "file_paths": list(full_file_contents.keys()) + list(chunk_contents.keys()),
             "all_file_contents": all_file_contents,
             "rag_metadata": {
@@ -1666,6 +1157,66 @@ class RAGSystem:
                 "retrieval_strategy": "smart_multi_file",
             },
         }
+        self._semantic_cache_store(query_embedding, cache_gate, result)
+        return result
+
+    def _semantic_cache_lookup(
+        self, query_embedding: np.ndarray, gate: Tuple
+    ) -> Optional[Dict[str, Any]]:
+        """Cached answer for the most similar query with the same gate, if any"""
+        now = time.monotonic()
+        with self._semantic_cache_lock:
+            self._semantic_cache = [
+                entry
+                for entry in self._semantic_cache
+                if now - entry[0] < self.semantic_cache_ttl
+            ]
+            candidates = [entry for entry in self._semantic_cache if entry[2] == gate]
+        if not candidates:
+            return None
+
+        # Cosine similarity to every candidate in one product of unit vectors
+        similarities = np.stack([entry[1] for entry in candidates]) @ query_embedding
+        best = int(np.argmax(similarities))
+        if similarities[best] < self.semantic_cache_threshold:
+            return None
+        entry = candidates[best]
+        if self._file_mtimes(entry[4]["file_paths"]) != entry[3]:
+            # A file was changed since, possibly outside write_file_content
+            with self._semantic_cache_lock:
+                self._semantic_cache = [
+                    cached for cached in self._semantic_cache if cached is not entry
+                ]
+            return None
+        return entry[4]
+
+    def _semantic_cache_store(
+        self, query_embedding: np.ndarray, gate: Tuple, result: Dict[str, Any]
+    ):
+        """Remember ``result`` for queries close to ``query_embedding``"""
+        file_mtimes = self._file_mtimes(result["file_paths"])
+        if file_mtimes is None:
+            return
+        with self._semantic_cache_lock:
+            self._semantic_cache.append(
+                (time.monotonic(), query_embedding, gate, file_mtimes, result)
+            )
+            del self._semantic_cache[: -self.semantic_cache_size]
+
+    def _clear_semantic_cache(self):
+        """Forget every cached smart-context answer"""
+        with self._semantic_cache_lock:
+            self._semantic_cache = []
+
+    def _file_mtimes(self, file_paths: List[str]) -> Optional[Dict[str, int]]:
+        """mtime of each project file, None if one cannot be stat()ed"""
+        try:
+            return {
+                file_path: os.stat(self.project_path / file_path).st_mtime_ns
+                for file_path in file_paths
+            }
+        except OSError:
+            return None
 
     def get_relevant_context(
         self,
@@ -1683,6 +1234,15 @@ class RAGSystem:
 
     def invalidate_cache(self):
         """Clear all cached data"""
+        # Drop the chunks first: their embeddings are memory-mapped views of
+        # chunk_embeddings.npy, which cannot be deleted on Windows while open
+        self.chunks = {}
+        self.index = None
+        self.chunk_ids = []
+        self.indexed_chunks = []
+        self._clear_semantic_cache()
+        self.dependency_analyzer = FileDependencyAnalyzer()
+
         try:
             if self.chunks_cache_file.exists():
                 self.chunks_cache_file.unlink()
@@ -1692,11 +1252,10 @@ class RAGSystem:
                 self.metadata_cache_file.unlink()
             if self.dependency_cache_file.exists():
                 self.dependency_cache_file.unlink()
-
-            self.chunks = {}
-            self.index = None
-            self.chunk_ids = []
-            self.dependency_analyzer = FileDependencyAnalyzer()
+            # Embeddings are cached by content hash and can never go stale,
+            # so they stay for the re-index that follows
+            if self.chunk_embeddings_file.exists():
+                self.chunk_embeddings_file.unlink()
 
             logger.info("Cleared RAG cache")
         except Exception as e:
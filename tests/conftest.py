@@ -0,0 +1,6 @@
+# The test modules stub out heavy dependencies that are missing. Import numpy
+# first when it is installed, so those stubs never shadow the real package.
+try:
+    import numpy  # noqa: F401
+except ImportError:
+    pass
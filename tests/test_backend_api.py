@@ -18,7 +18,7 @@ for mod in [
 ]:
     sys.modules.setdefault(mod, types.ModuleType(mod.split(".")[-1]))
 
-if "numpy" in sys.modules:
+if not hasattr(sys.modules["numpy"], "ndarray"):
     sys.modules["numpy"].ndarray = object
 if "sentence_transformers" in sys.modules:
     sys.modules["sentence_transformers"].SentenceTransformer = object
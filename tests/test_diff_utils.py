@@ -0,0 +1,63 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from diff_utils import ContextualDiffProcessor, DiffProcessor
+
+
+def test_apply_with_validation_replaces_with_context():
+    content = "def a():\n    return 1\n\ndef b():\n    return 1\n"
+    changes = [
+        {
+            "operation": "replace",
+            "target_content": "return 1",
+            "replacement_content": "return 2",
+            "before_context": "def b():\n    ",
+        }
+    ]
+    valid, err_msg, new_content = ContextualDiffProcessor.apply_with_validation(
+        content, changes
+    )
+    assert valid and err_msg == ""
+    assert new_content == "def a():\n    return 1\n\ndef b():\n    return 2\n"
+
+
+def test_apply_with_validation_reports_missing_target():
+    content = "x = 1\n"
+    changes = [{"operation": "delete", "target_content": "y = 2"}]
+    valid, err_msg, new_content = ContextualDiffProcessor.apply_with_validation(
+        content, changes
+    )
+    assert not valid
+    assert "y = 2" in err_msg
+    assert new_content == content
+
+
+def test_apply_partial_changes_uses_original_line_numbers():
+    content = "a\nb\nc\nd\n"
+    changes = [
+        {"operation": "insert", "line": 1, "content": "inserted\n"},
+        {"operation": "replace", "start_line": 3, "end_line": 3, "content": "C\n"},
+        {"operation": "delete", "start_line": 4},
+    ]
+    assert DiffProcessor.validate_changes(content, changes) == (True, "")
+    assert (
+        DiffProcessor.apply_partial_changes(content, changes) == "a\ninserted\nb\nC\n"
+    )
+
+
+def test_apply_contextual_changes_non_strict_skips_missing_targets():
+    content = "a = 1\nb = 2\n"
+    changes = [
+        {"operation": "delete", "target_content": "missing"},
+        {
+            "operation": "replace",
+            "target_content": "b = 2",
+            "replacement_content": "b = 3",
+        },
+    ]
+    assert (
+        ContextualDiffProcessor.apply_contextual_changes(content, changes, strict=False)
+        == "a = 1\nb = 3\n"
+    )
@@ -0,0 +1,79 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from golang_edit_helpers import GolangEditHelper
+
+GO_SOURCE = """package main
+
+import "fmt"
+
+type Server struct {
+    Name string
+}
+
+func (s *Server) Greet() {
+    fmt.Println("}")
+    // closing } in a comment
+    if s.Name == `{` {
+        return
+    }
+}
+
+func main() {}
+"""
+
+
+def test_function_edit_ignores_braces_in_literals_and_comments():
+    edit = GolangEditHelper.create_function_edit(GO_SOURCE, "Greet", "    return")
+    assert edit["target_content"].startswith("func (s *Server) Greet() {")
+    assert edit["target_content"].endswith("        return\n    }\n}")
+    assert edit["after_context"] == "\nfunc main() {}"
+
+
+def test_struct_field_edit_replaces_existing_field():
+    edit = GolangEditHelper.create_struct_field_edit(
+        GO_SOURCE, "Server", "Name", "Name []string"
+    )
+    assert edit["operation"] == "replace"
+    assert edit["target_content"] == "    Name string"
+    assert edit["before_context"] == "type Server struct {"
+
+
+def test_function_edit_spans_multiline_signature():
+    source = "package main\n\nfunc Sum(\n    a int,\n    b int,\n) int {\n    return a + b\n}\n"
+    edit = GolangEditHelper.create_function_edit(source, "Sum", "    return 0", False)
+    assert edit["target_content"] == source[len("package main\n\n") : -1]
+    assert edit["after_context"] == ""
+
+
+def test_batch_edits_dispatch_each_op():
+    edits = GolangEditHelper.create_batch_edits(
+        GO_SOURCE,
+        [
+            {"type": "import", "import_path": "os"},
+            {"type": "function", "function_name": "main", "new_function_body": ""},
+            {
+                "type": "struct_field",
+                "struct_name": "Server",
+                "field_name": "Port",
+                "new_field_definition": "Port int",
+            },
+        ],
+    )
+    assert [edit["operation"] for edit in edits] == [
+        "replace",
+        "replace",
+        "insert_before",
+    ]
+    assert edits[0]["target_content"] == 'import "fmt"'
+    assert edits[1]["target_content"] == "func main() {}"
+
+
+def test_import_edit_only_skips_paths_that_are_imported():
+    source = 'package main\n\nimport "fmt"\nimport "os"\n\nvar name = "strings"\n'
+    assert GolangEditHelper.create_import_edit(source, "os")["operation"] == "skip"
+    edit = GolangEditHelper.create_import_edit(source, "strings")
+    assert edit["operation"] == "replace"
+    assert edit["target_content"] == 'import "fmt"'
@@ -0,0 +1,269 @@
+import hashlib
+import os
+import pickle
+import sys
+import time
+import types
+from dataclasses import replace
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+# Provide minimal stubs so rag_system can be imported without the heavy
+# packages installed; the tests swap in fakes for the parts they use.
+for mod in ["faiss", "networkx", "sentence_transformers"]:
+    sys.modules.setdefault(mod, types.ModuleType(mod))
+
+if not hasattr(sys.modules["sentence_transformers"], "SentenceTransformer"):
+    sys.modules["sentence_transformers"].SentenceTransformer = object
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import rag_system
+from rag_system import RAGSystem
+
+
+class FakeIndex:
+    """Exact inner-product index standing in for the FAISS ones"""
+
+    def __init__(self, dimension, *args):
+        self.vectors = np.zeros((0, dimension), dtype="float32")
+
+    def train(self, vectors):
+        pass
+
+    def add(self, vectors):
+        self.vectors = np.vstack([self.vectors, vectors])
+
+    def search(self, queries, k):
+        scores = self.vectors @ queries[0]
+        order = np.argsort(-scores, kind="stable")[:k]
+        return scores[order][None], order[None]
+
+
+def _write_index(index, path):
+    with open(path, "wb") as f:
+        pickle.dump(index, f)
+
+
+def _read_index(path):
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+class FakeGraph:
+    """The part of networkx.DiGraph the dependency analyzer uses"""
+
+    def __init__(self):
+        self.nodes = set()
+        self.edges = set()
+
+    def has_node(self, node):
+        return node in self.nodes
+
+    def add_node(self, node, **attrs):
+        self.nodes.add(node)
+
+    def add_edge(self, source, target, **attrs):
+        self.nodes.update((source, target))
+        self.edges.add((source, target))
+
+
+class FakeEmbedder:
+    """Hash-based unit vectors, counting every text it embeds"""
+
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, texts, **kwargs):
+        single = isinstance(texts, str)
+        batch = [texts] if single else list(texts)
+        self.encoded.extend(batch)
+        vectors = np.array(
+            [
+                np.frombuffer(hashlib.sha256(text.encode()).digest(), dtype=np.uint8)[
+                    :16
+                ]
+                for text in batch
+            ],
+            dtype="float32",
+        )
+        vectors -= 127.5
+        vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors[0] if single else vectors
+
+
+@pytest.fixture(autouse=True)
+def fake_backends(monkeypatch):
+    monkeypatch.setattr(
+        rag_system,
+        "faiss",
+        types.SimpleNamespace(
+            IndexScalarQuantizer=FakeIndex,
+            IndexHNSWSQ=FakeIndex,
+            ScalarQuantizer=types.SimpleNamespace(QT_fp16=1),
+            METRIC_INNER_PRODUCT=0,
+            write_index=_write_index,
+            read_index=_read_index,
+        ),
+    )
+    monkeypatch.setattr(rag_system, "nx", types.SimpleNamespace(DiGraph=FakeGraph))
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    (root / "src").mkdir(parents=True)
+    (root / "src" / "a.py").write_text(
+        "def alpha(x):\n    return x + 1\n\n\nclass Alpha:\n    pass\n"
+    )
+    (root / "src" / "b.py").write_text("def beta(y):\n    return y * 2\n")
+    return root
+
+
+def _rag(project, cache_dir, embedder=None):
+    rag = RAGSystem(
+        str(project), cache_dir=str(cache_dir), embedder=embedder or FakeEmbedder()
+    )
+    rag.index_workers = 1
+    return rag
+
+
+def test_embedding_cache_survives_invalidation(project, tmp_path):
+    first = _rag(project, tmp_path / "cache")
+    chunk_count = first.index_project()
+    assert len(first.embedder.encoded) == chunk_count > 0
+
+    first.invalidate_cache()
+    assert first.embedding_cache_file.exists()
+
+    # Unchanged chunks hit the cache, the changed file's chunks miss it
+    (project / "src" / "b.py").write_text("def beta(y):\n    return y * 3\n")
+    second = _rag(project, tmp_path / "cache")
+    second.index_project()
+    assert second.embedder.encoded == [
+        f"{chunk.description}\n\n{chunk.content}"
+        for chunk in second.indexed_chunks
+        if chunk.file_path == os.path.join("src", "b.py")
+    ]
+
+
+def test_parallel_chunking_matches_sequential(project, tmp_path):
+    (project / "src" / "app.js").write_text(
+        'import { beta } from "./b";\nexport function App() {\n  return beta;\n}\n'
+    )
+    (project / "src" / "main.go").write_text(
+        'package main\n\nimport "fmt"\n\nfunc main() {\n\tfmt.Println("hi")\n}\n'
+    )
+    (project / "src" / "style.css").write_text(".button { color: red; }\n")
+
+    sequential = _rag(project, tmp_path / "sequential_cache")
+    sequential.index_project()
+    parallel = _rag(project, tmp_path / "parallel_cache")
+    parallel.index_workers = 2
+    parallel.parallel_min_files = 1
+    parallel.index_project()
+
+    assert sequential.indexed_chunks
+    assert [replace(chunk, embedding=None) for chunk in parallel.indexed_chunks] == [
+        replace(chunk, embedding=None) for chunk in sequential.indexed_chunks
+    ]
+
+
+def test_invalidate_cache_resets_memory_when_files_stay_locked(
+    project, tmp_path, monkeypatch
+):
+    _rag(project, tmp_path / "cache").index_project()
+    rag = _rag(project, tmp_path / "cache")
+    assert rag.chunks
+
+    def locked(path, *args, **kwargs):
+        raise PermissionError(f"{path} is in use")
+
+    monkeypatch.setattr(type(rag.chunks_cache_file), "unlink", locked)
+    rag.invalidate_cache()
+    assert rag.chunks == {} and rag.indexed_chunks == [] and rag.index is None
+
+
+def test_reindex_reuses_unchanged_files(project, tmp_path, monkeypatch):
+    first = _rag(project, tmp_path / "cache")
+    first.index_project()
+    unchanged = [
+        replace(chunk, embedding=None)
+        for chunk in first.indexed_chunks
+        if chunk.file_path == os.path.join("src", "a.py")
+    ]
+    assert unchanged and unchanged[0].exported_symbols
+
+    chunked = []
+    chunk_file = rag_system._chunk_file
+
+    def recording_chunk_file(chunker, file_path, relative_path):
+        chunked.append(relative_path)
+        return chunk_file(chunker, file_path, relative_path)
+
+    monkeypatch.setattr(rag_system, "_chunk_file", recording_chunk_file)
+    for multiplier in (3, 4):
+        changed = project / "src" / "b.py"
+        changed.write_text(f"def beta(y):\n    return y * {multiplier}\n")
+        os.utime(changed, (time.time() + multiplier, time.time() + multiplier))
+
+        rag = _rag(project, tmp_path / "cache")
+        assert not rag.chunks  # the saved index is out of date
+        rag.index_project()
+        assert [
+            replace(chunk, embedding=None)
+            for chunk in rag.indexed_chunks
+            if chunk.file_path == os.path.join("src", "a.py")
+        ] == unchanged
+
+    assert chunked == [os.path.join("src", "b.py")] * 2
+
+
+def test_saved_index_goes_stale_when_a_file_is_deleted(project, tmp_path):
+    _rag(project, tmp_path / "cache").index_project()
+    assert _rag(project, tmp_path / "cache").chunks
+
+    (project / "src" / "b.py").unlink()
+    assert not _rag(project, tmp_path / "cache").chunks
+
+
+def test_semantic_cache_misses_once_a_file_in_the_answer_changes(project, tmp_path):
+    rag = _rag(project, tmp_path / "cache")
+    rag.index_project()
+    searches = []
+    search_embedding = rag._search_embedding
+
+    def counting_search_embedding(*args, **kwargs):
+        searches.append(args)
+        return search_embedding(*args, **kwargs)
+
+    rag._search_embedding = counting_search_embedding
+
+    first = rag.get_relevant_context_smart("alpha")
+    assert first["file_paths"]
+    rag.get_relevant_context_smart("alpha")
+    assert len(searches) == 1
+
+    changed = project / first["file_paths"][0]
+    os.utime(changed, (time.time() + 10, time.time() + 10))
+    rag.get_relevant_context_smart("alpha")
+    assert len(searches) == 2
+
+
+def test_semantic_cache_drops_stale_entry_already_pruned_elsewhere(project, tmp_path):
+    rag = _rag(project, tmp_path / "cache")
+    rag.index_project()
+    assert rag.get_relevant_context_smart("alpha")["file_paths"]
+    query_embedding = rag._embed_query("alpha")
+    gate = rag._semantic_cache[0][2]
+
+    def changed_meanwhile(file_paths):
+        # Another request prunes the cache while this one checks the files
+        rag._clear_semantic_cache()
+        return {}
+
+    rag._file_mtimes = changed_meanwhile
+    assert rag._semantic_cache_lookup(query_embedding, gate) is None
+    assert rag._semantic_cache == []
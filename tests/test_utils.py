@@ -16,7 +16,7 @@ for mod in [
 ]:
     sys.modules.setdefault(mod, types.ModuleType(mod))
 
-if "numpy" in sys.modules:
+if not hasattr(sys.modules["numpy"], "ndarray"):
     sys.modules["numpy"].ndarray = object
 
 # Provide minimal attribute so importing utils doesn't fail when accessing
@@ -51,3 +51,195 @@ def test_get_project_structure(tmp_path):
     assert names == ["file1.txt", "subdir"]
     subdir_node = next(c for c in structure["children"] if c["name"] == "subdir")
     assert any(child["name"] == "file2.txt" for child in subdir_node["children"])
+
+
+def test_write_file_content_finds_project_root_after_marker_added(tmp_path):
+    import utils
+
+    project = tmp_path / "project"
+    (project / "src").mkdir(parents=True)
+    assert write_file_content(str(project / "src" / "a.py"), "a = 1\n")
+    assert utils._find_project_root((project / "src").resolve()) != str(
+        project.resolve()
+    )
+
+    assert write_file_content(str(project / "package.json"), "{}")
+    assert write_file_content(str(project / "src" / "a.py"), "a = 2\n")
+    assert utils._find_project_root((project / "src").resolve()) == str(
+        project.resolve()
+    )
+
+
+def test_get_rag_context_caches_until_project_write(tmp_path):
+    import utils
+
+    class FakeRAG:
+        calls = 0
+
+        def get_relevant_context_smart(self, *args, **kwargs):
+            FakeRAG.calls += 1
+            return {"file_paths": ["a.py"], "all_file_contents": {"a.py": "x"}}
+
+        def invalidate_cache(self):
+            pass
+
+    project = str(tmp_path)
+    (tmp_path / "a.py").write_text("x")
+    utils._rag_systems[project] = FakeRAG()
+    first = utils.get_rag_context("Fix the button", project)
+    first["editing_recommendation"] = "set by caller"
+    second = utils.get_rag_context("  Fix the button ", project)
+    assert FakeRAG.calls == 1
+    assert "editing_recommendation" not in second
+    assert second["rag_metadata"]["search_query"] == "  Fix the button "
+
+    # Differently cased queries can retrieve different components
+    utils.get_rag_context("fix the BUTTON", project)
+    assert FakeRAG.calls == 2
+
+    utils.invalidate_rag_cache(project)
+    utils._rag_systems[project] = FakeRAG()
+    utils.get_rag_context("Fix the button", project)
+    assert FakeRAG.calls == 3
+    utils._rag_systems.pop(project, None)
+
+
+def test_get_rag_system_indexes_once_under_concurrent_calls(tmp_path, monkeypatch):
+    import threading
+    import time
+
+    import utils
+
+    created = []
+
+    class SlowRAG:
+        def __init__(self, project_path):
+            created.append(project_path)
+            self.chunks = {}
+
+        def index_project(self):
+            time.sleep(0.05)
+            self.chunks = {"chunk": object()}
+
+    monkeypatch.setattr(utils, "RAGSystem", SlowRAG)
+    project = str(tmp_path)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(utils.get_rag_system(project)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert created == [project]
+    assert len({id(rag_system) for rag_system in results}) == 1
+    utils._rag_systems.pop(project, None)
+
+
+def test_get_project_structure_reuses_tree_until_a_directory_changes(tmp_path):
+    (tmp_path / "subdir").mkdir()
+    (tmp_path / "subdir" / "file1.txt").write_text("a")
+    for directory in (tmp_path, tmp_path / "subdir"):
+        os.utime(directory, (1_000_000_000, 1_000_000_000))
+
+    first = get_project_structure(str(tmp_path))
+    assert get_project_structure(str(tmp_path)) is first
+
+    (tmp_path / "subdir" / "file2.txt").write_text("b")
+    structure = get_project_structure(str(tmp_path))
+    subdir_node = next(c for c in structure["children"] if c["name"] == "subdir")
+    names = [child["name"] for child in subdir_node["children"]]
+    assert names == ["file1.txt", "file2.txt"]
+
+
+def test_get_rag_context_skips_retrieval_for_file_local_requests(tmp_path):
+    import utils
+
+    context = utils.get_rag_context("Format this file", str(tmp_path), "a.py")
+    assert context["file_paths"] == [] and context["all_file_contents"] == {}
+    assert str(tmp_path) not in utils._rag_systems
+
+
+def test_relative_paths_follow_the_working_directory(tmp_path, monkeypatch):
+    for name in ("one", "two"):
+        (tmp_path / name).mkdir()
+        monkeypatch.chdir(tmp_path / name)
+        assert write_file_content("notes.txt", name)
+        assert read_file_content("notes.txt") == name
+
+    assert (tmp_path / "one" / "notes.txt").read_text() == "one"
+
+
+def test_get_all_project_files_context_skips_binary_files(tmp_path):
+    from utils import get_all_project_files_context
+
+    (tmp_path / "a.txt").write_text("text")
+    (tmp_path / "b.dat").write_bytes(b"\x89DATA\x00\x01\x02" * 100)
+
+    contents = get_all_project_files_context(str(tmp_path))["all_file_contents"]
+    assert contents["a.txt"] == "text"
+    assert "binary file" in contents["b.dat"]
+
+
+def test_write_file_content_invalidates_rag_project_without_marker(
+    tmp_path, monkeypatch
+):
+    import utils
+
+    class FakeRAG:
+        chunks = ["chunk"]
+
+        def __init__(self, project_path):
+            pass
+
+        def invalidate_cache(self):
+            pass
+
+    monkeypatch.setattr(utils, "RAGSystem", FakeRAG)
+    project = str(tmp_path / "project")
+    os.makedirs(os.path.join(project, "src"))
+    utils.get_rag_system(project)
+    assert project in utils._rag_systems
+
+    assert write_file_content(os.path.join(project, "src", "a.py"), "a = 1\n")
+    assert project not in utils._rag_systems
+
+
+def test_get_rag_context_cache_misses_after_outside_edit(tmp_path):
+    import utils
+
+    class FakeRAG:
+        calls = 0
+
+        def get_relevant_context_smart(self, *args, **kwargs):
+            FakeRAG.calls += 1
+            content = (tmp_path / "a.py").read_text()
+            return {"file_paths": ["a.py"], "all_file_contents": {"a.py": content}}
+
+    project = str(tmp_path)
+    (tmp_path / "a.py").write_text("old")
+    os.utime(tmp_path / "a.py", (1_000_000_000, 1_000_000_000))
+    utils._rag_systems[project] = FakeRAG()
+    utils.get_rag_context("Fix the button", project)
+
+    # Edited outside write_file_content, e.g. by git pull or another editor
+    (tmp_path / "a.py").write_text("new")
+    context = utils.get_rag_context("Fix the button", project)
+    assert FakeRAG.calls == 2
+    assert context["all_file_contents"]["a.py"] == "new"
+    utils._rag_systems.pop(project, None)
+
+
+def test_write_file_content_follows_a_repointed_symlink(tmp_path):
+    link = tmp_path / "link"
+    link.symlink_to(tmp_path / "x")
+    assert write_file_content(str(link), "first")
+
+    link.unlink()
+    link.symlink_to(tmp_path / "y")
+    assert write_file_content(str(link), "second")
+    assert read_file_content(str(link)) == "second"
+    assert (tmp_path / "x").read_text() == "first"
+    assert (tmp_path / "y").read_text() == "second"
@@ -1,8 +1,14 @@
+import fnmatch
+import functools
 import os
+import re
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
 from pathlib import Path
 import logging
-from typing import List, Dict, Any, Optional, Set
-import streamlit as st
+from typing import Iterator, List, Dict, Any, Deque, FrozenSet, Optional, Set, Tuple
 from rag_system import RAGSystem
 
 # Configure basic logging
@@ -26,23 +32,142 @@ COMMON_IGNORE_FILES: Set[str] = {".DS_Store", "*.pyc", "*.log", "*.swp", "*.swo"
 MAX_PROJECT_CONTEXT_CHARS: int = (
     1000000  # Max characters for all_file_contents to send to AI
 )
+# Characters read at a time when measuring the part of a file past the limit
+_COUNT_BLOCK_CHARS: int = 1 << 20
+# Threads reading project files, and how many reads may run ahead of the
+# file being added to the context
+_READ_WORKERS: int = min(32, (os.cpu_count() or 1) * 4)
+_READ_WINDOW: int = 2 * _READ_WORKERS
+# Files up to this size are read with a single system call
+_SMALL_FILE_BYTES: int = 64 * 1024
+# Leading bytes searched for a NUL to tell binary files from text
+_BINARY_SNIFF_BYTES: int = 8192
+
+
+@functools.lru_cache(maxsize=32)
+def _compile_wildcards(
+    patterns: FrozenSet[str],
+) -> Tuple[Tuple[str, ...], Optional["re.Pattern[str]"]]:
+    """Split the wildcards of an ignore set for fast name matching
+
+    ``*suffix`` patterns such as ``*.pyc`` become a tuple for a single
+    ``str.endswith`` call, any other wildcard joins one compiled regex.
+    Literal names are left to set lookups.
+    """
+    suffixes = []
+    others = []
+    for pattern in sorted(patterns):
+        if "*" not in pattern:
+            continue
+        if pattern.startswith("*") and not any(c in pattern[1:] for c in "*?["):
+            suffixes.append(pattern[1:])
+        else:
+            others.append(pattern)
+    regex = (
+        re.compile("|".join(fnmatch.translate(pattern) for pattern in others))
+        if others
+        else None
+    )
+    return tuple(suffixes), regex
+
+
+def _matches_wildcards(
+    name: str, wildcards: Tuple[Tuple[str, ...], Optional["re.Pattern[str]"]]
+) -> bool:
+    suffixes, regex = wildcards
+    return name.endswith(suffixes) or (regex is not None and bool(regex.match(name)))
+
+
+_IGNORED_NAMES = frozenset(COMMON_IGNORE_DIRS | COMMON_IGNORE_FILES)
+_IGNORE_DIR_WILDCARDS = _compile_wildcards(frozenset(COMMON_IGNORE_DIRS))
+_IGNORE_FILE_WILDCARDS = _compile_wildcards(frozenset(COMMON_IGNORE_FILES))
 
 # Global RAG system instance
 _rag_systems: Dict[str, RAGSystem] = {}
+# Guards _rag_systems; a project being set up has an event that is set once
+# its RAG system is ready, so concurrent callers wait instead of indexing too
+_rag_systems_lock = threading.Lock()
+_rag_init_events: Dict[str, threading.Event] = {}
+
+# Recent get_rag_context results, least recently used first, with the time
+# each was stored and the mtime of every file in it. A result is only reused
+# while none of those files changed, even by something other than
+# write_file_content. Guarded by _rag_result_lock
+_RAG_RESULT_CACHE_SIZE = 128
+_RAG_RESULT_TTL_SECONDS = 300.0
+_RagCacheKey = Tuple[str, str, Optional[str], int]
+_rag_result_cache: (
+    "OrderedDict[_RagCacheKey, Tuple[float, Dict[str, int], Dict[str, Any]]]"
+) = OrderedDict()
+_rag_result_lock = threading.Lock()
+
+# Trees built by get_project_structure per root and ignore sets, with the
+# mtime of every directory listed for them. A tree is reused while none of
+# those directories changed, since adding, removing or renaming an entry
+# updates the mtime of the directory holding it
+_structure_cache: Dict[
+    Tuple[str, FrozenSet[str], FrozenSet[str]], Tuple[Dict[str, int], Dict[str, Any]]
+] = {}
+# Directories modified this close to being listed may change again within
+# the same timestamp tick, so such trees are not cached
+_MTIME_RACE_NS = 2_000_000_000
+
+# Files or folders that mark the root of a project
+_PROJECT_MARKERS = (".git", "requirements.txt", "package.json")
+# Project root found for each directory written to, None when there is none
+_project_roots: Dict[str, Optional[str]] = {}
+# Resolved root of every project a RAG system was set up for, as a directory
+# prefix, with the project path it was set up under; longest prefix first
+_known_project_roots: List[Tuple[str, str]] = []
 
 
 def get_rag_system(project_path: str) -> RAGSystem:
     """Get or create RAG system for project"""
     global _rag_systems
 
-    if project_path not in _rag_systems:
-        _rag_systems[project_path] = RAGSystem(project_path)
+    with _rag_systems_lock:
+        if project_path in _rag_systems:
+            return _rag_systems[project_path]
+        init_event = _rag_init_events.get(project_path)
+        if init_event is None:
+            init_event = _rag_init_events[project_path] = threading.Event()
+            creating = True
+        else:
+            creating = False
+
+    if not creating:
+        # Another caller is setting the project up; if that failed, try again
+        init_event.wait()
+        return get_rag_system(project_path)
+
+    try:
+        rag_system = RAGSystem(project_path)
         # Index project if not already cached
-        if not _rag_systems[project_path].chunks:
+        if not rag_system.chunks:
             logger.info("Indexing project for RAG...")
-            _rag_systems[project_path].index_project()
+            rag_system.index_project()
+        root_prefix = os.path.join(os.path.realpath(project_path), "")
+        with _rag_systems_lock:
+            _rag_systems[project_path] = rag_system
+            if (root_prefix, project_path) not in _known_project_roots:
+                _known_project_roots.append((root_prefix, project_path))
+                _known_project_roots.sort(key=lambda root: -len(root[0]))
+        return rag_system
+    finally:
+        with _rag_systems_lock:
+            del _rag_init_events[project_path]
+        init_event.set()
+
+
+# Requests that act on the open file alone, with no need for project context
+_RE_FILE_LOCAL_REQUEST = re.compile(
+    r"^\s*(?:format|reformat|lint|fix\s+(?:the\s+)?typos?)\b", re.IGNORECASE
+)
+
 
-    return _rag_systems[project_path]
+def _needs_rag(user_query: str) -> bool:
+    """Whether answering ``user_query`` calls for retrieving project context"""
+    return not _RE_FILE_LOCAL_REQUEST.match(user_query)
 
 
 def get_rag_context(
@@ -51,7 +176,38 @@ def get_rag_context(
     current_file: Optional[str] = None,
     max_tokens: int = 20000,
 ) -> Dict[str, Any]:
-    """Enhanced RAG-based context that includes full files when needed"""
+    """Enhanced RAG-based context that includes full files when needed
+
+    Results are cached per project, query, current file and token budget
+    for a few minutes, until a write to the project invalidates them.
+    Requests that only act on the open file get no project context.
+    """
+    if current_file and not _needs_rag(user_query):
+        logger.info(f"Skipping RAG retrieval for file-local request: {user_query!r}")
+        return {
+            "file_paths": [],
+            "all_file_contents": {},
+            "rag_metadata": {"retrieval_strategy": "skipped_file_local"},
+        }
+
+    # Case is kept: component lookups match PascalCase names case-sensitively
+    cache_key = (project_path, user_query.strip(), current_file, max_tokens)
+    with _rag_result_lock:
+        cached = _rag_result_cache.get(cache_key)
+    if (
+        cached is not None
+        and time.monotonic() - cached[0] < _RAG_RESULT_TTL_SECONDS
+        and _mtimes_unchanged(cached[1])
+    ):
+        with _rag_result_lock:
+            if cache_key in _rag_result_cache:
+                _rag_result_cache.move_to_end(cache_key)
+        # Callers add keys to the result, so each gets its own copy
+        return {
+            **cached[2],
+            "rag_metadata": {**cached[2]["rag_metadata"], "search_query": user_query},
+        }
+
     try:
         rag_system = get_rag_system(project_path)
 
@@ -76,16 +232,25 @@ def get_rag_context(
                 "If you need to edit them, ask the user to open the file first.\n"
             )
 
-            # Prepend instructions to the context
+            # Prepend instructions to the context. The contents dict can be
+            # shared with the RAG system's answer cache, so it is copied
+            # rather than reordered in place
             if all_file_contents:
-                first_file = list(all_file_contents.keys())[0]
                 all_file_contents = {"_instructions": instructions, **all_file_contents}
 
-        return {
+        result = {
             "file_paths": file_paths,
             "all_file_contents": all_file_contents,
             "rag_metadata": rag_metadata,
         }
+        file_mtimes = _file_mtimes(project_path, file_paths)
+        if file_mtimes is not None:
+            with _rag_result_lock:
+                _rag_result_cache[cache_key] = (time.monotonic(), file_mtimes, result)
+                _rag_result_cache.move_to_end(cache_key)
+                while len(_rag_result_cache) > _RAG_RESULT_CACHE_SIZE:
+                    _rag_result_cache.popitem(last=False)
+        return dict(result)
 
     except Exception as e:
         logger.error(f"RAG context retrieval failed: {e}")
@@ -94,12 +259,32 @@ def get_rag_context(
 
 
 def invalidate_rag_cache(project_path: str):
-    """Invalidate RAG cache for project (call when files change)"""
+    """Invalidate RAG cache for project (call when files change)
+
+    Only the in-memory system and answers are dropped. The index files on
+    disk stay, so the next get_rag_system sees they are out of date and
+    re-indexes, reusing the chunks and embeddings of unchanged files.
+    """
     global _rag_systems
 
-    if project_path in _rag_systems:
-        _rag_systems[project_path].invalidate_cache()
-        del _rag_systems[project_path]
+    with _rag_result_lock:
+        for cache_key in [key for key in _rag_result_cache if key[0] == project_path]:
+            del _rag_result_cache[cache_key]
+
+    with _rag_systems_lock:
+        _rag_systems.pop(project_path, None)
+
+
+@functools.lru_cache(maxsize=None)
+def _get_st():
+    """The streamlit module, imported on first use
+
+    Only the Streamlit UI needs it; the backend API and the RAG pipeline
+    import this module without paying for streamlit and its dependencies.
+    """
+    import streamlit
+
+    return streamlit
 
 
 def display_file_tree_sidebar(
@@ -115,6 +300,7 @@ def display_file_tree_sidebar(
     - selected_file_path: the currently selected file's absolute path.
     - indent_level: depth level for nested display indentation.
     """
+    st = _get_st()
     indent = " " * indent_level * 2  # Visual indent using spaces
 
     if node["type"] == "directory":
@@ -138,6 +324,11 @@ def get_project_structure(
     ignore_dirs: Optional[Set[str]] = None,
     ignore_files: Optional[Set[str]] = None,
 ) -> Optional[Dict[str, Any]]:
+    """Tree of the project's files and folders, ignored ones left out
+
+    Repeated calls return the same cached tree until a directory in it
+    changes, so callers must treat the result as read-only.
+    """
     effective_ignore_dirs = (
         ignore_dirs if ignore_dirs is not None else COMMON_IGNORE_DIRS
     )
@@ -150,49 +341,163 @@ def get_project_structure(
         logger.error(f"Project path not found or is not a directory: {root_path}")
         return None
 
-    def _is_ignored(item: Path, project_root: Path) -> bool:
-        if item.name in effective_ignore_dirs or item.name in effective_ignore_files:
+    cache_key = (
+        str(root_path),
+        frozenset(effective_ignore_dirs),
+        frozenset(effective_ignore_files),
+    )
+    cached = _structure_cache.get(cache_key)
+    if cached is not None and _mtimes_unchanged(cached[0]):
+        return cached[1]
+
+    ignored_names = frozenset(effective_ignore_dirs) | frozenset(effective_ignore_files)
+    # Wildcard patterns for ignored dirs/files (simple glob for now), compiled once
+    dir_wildcards = _compile_wildcards(frozenset(effective_ignore_dirs))  # "*.egg-info"
+    file_wildcards = _compile_wildcards(frozenset(effective_ignore_files))  # "*.pyc"
+
+    def _is_ignored(item: os.DirEntry) -> bool:
+        if item.name in ignored_names:
             return True
-        # Check wildcard patterns for ignored dirs/files (simple glob for now)
-        for pattern in effective_ignore_dirs:  # e.g. "*.egg-info"
-            if "*" in pattern and item.is_dir() and item.match(pattern):
-                return True
-        for pattern in effective_ignore_files:  # e.g. "*.pyc"
-            if "*" in pattern and item.is_file() and item.match(pattern):
-                return True
+        if _matches_wildcards(item.name, dir_wildcards) and item.is_dir():
+            return True
+        if _matches_wildcards(item.name, file_wildcards) and item.is_file():
+            return True
+        # Ignored directories are never descended into, so no ancestor of
+        # item can be one
+        return False
 
-        try:
-            relative_to_root = item.relative_to(project_root)
-            for part in relative_to_root.parts[:-1]:
-                if part in effective_ignore_dirs:
-                    return True
-        except ValueError:
-            pass
+    tree: Dict[str, Any] = {
+        "name": root_path.name,
+        "path": str(root_path),  # Keep absolute path for server-side reference
+        "relative_path": ".",  # Add relative path for client
+        "type": "directory",
+        "children": [],
+    }
+    # Directories still to list: their node, path, relative path prefix and
+    # whether a symlink was followed to reach them
+    pending = [(tree, str(root_path), "", False)]
+    dir_mtimes: Dict[str, int] = {}
+    listed_at = time.time_ns()
+    while pending:
+        node, dir_path, relative_dir, linked = pending.pop()
+        dir_mtimes[dir_path] = os.stat(dir_path).st_mtime_ns
+        with os.scandir(dir_path) as entries:
+            items = sorted(entries, key=lambda x: (x.is_file(), x.name.lower()))
+        for item in items:
+            if _is_ignored(item):
+                continue
+            is_dir = item.is_dir()
+            item_linked = linked or item.is_symlink()
+            relative_path = relative_dir + item.name
+            child: Dict[str, Any] = {
+                "name": item.name,
+                # Paths only need resolving once a symlink is involved
+                "path": os.path.realpath(item.path) if item_linked else item.path,
+                "relative_path": relative_path,
+                "type": "directory" if is_dir else "file",
+                "children": [],
+            }
+            node["children"].append(child)
+            if is_dir:
+                pending.append((child, item.path, relative_path + "/", item_linked))
+
+    if all(listed_at - mtime > _MTIME_RACE_NS for mtime in dir_mtimes.values()):
+        _structure_cache[cache_key] = (dir_mtimes, tree)
+    else:
+        _structure_cache.pop(cache_key, None)
+    return tree
+
+
+def _mtimes_unchanged(mtimes: Dict[str, int]) -> bool:
+    """Whether every path still has the mtime recorded for it"""
+    try:
+        return all(os.stat(path).st_mtime_ns == mtime for path, mtime in mtimes.items())
+    except OSError:
         return False
 
-    def _build_tree(current_path: Path, project_root: Path) -> Dict[str, Any]:
-        tree_node: Dict[str, Any] = {
-            "name": current_path.name,
-            "path": str(
-                current_path.resolve()
-            ),  # Keep absolute path for server-side reference
-            "relative_path": str(
-                current_path.relative_to(project_root).as_posix()
-            ),  # Add relative path for client
-            "type": "directory" if current_path.is_dir() else "file",
-            "children": [],
-        }
-        if current_path.is_dir():
-            sorted_items = sorted(
-                current_path.iterdir(), key=lambda x: (x.is_file(), x.name.lower())
-            )
-            for item in sorted_items:
-                if _is_ignored(item, project_root):
-                    continue
-                tree_node["children"].append(_build_tree(item, project_root))
-        return tree_node
 
-    return _build_tree(root_path, root_path)
+def _file_mtimes(project_path: str, file_paths: List[str]) -> Optional[Dict[str, int]]:
+    """mtime of each project file, by absolute path; None if one is missing"""
+    mtimes = {}
+    for file_path in file_paths:
+        path = os.path.join(project_path, file_path)
+        try:
+            mtimes[path] = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+    return mtimes
+
+
+def _is_ignored_name(name: str, is_dir: bool) -> bool:
+    """Whether a file or directory called ``name`` is left out of the context"""
+    if name in _IGNORED_NAMES:
+        return True
+    return _matches_wildcards(
+        name, _IGNORE_DIR_WILDCARDS if is_dir else _IGNORE_FILE_WILDCARDS
+    )
+
+
+def _iter_project_files(
+    directory: str, relative_dir: str = ""
+) -> Iterator[Tuple[str, os.DirEntry]]:
+    """Every file below ``directory`` that is not ignored, unordered
+
+    Yields the posix path relative to the walk's root with the scandir entry.
+    Ignored directories are never entered, and neither are symlinked ones.
+    """
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir() and not entry.is_symlink()
+            if _is_ignored_name(entry.name, is_dir):
+                continue
+            relative_path = relative_dir + entry.name
+            if is_dir:
+                yield from _iter_project_files(entry.path, relative_path + "/")
+            elif entry.is_file():
+                yield relative_path, entry
+        except OSError:
+            continue
+
+
+def _read_capped(path: str, limit: int) -> Tuple[str, int]:
+    """At most the first ``limit + 1`` characters of a file, and its length
+
+    Text past that is only counted, so a long file never sits in memory.
+    Raises UnicodeDecodeError without decoding anything when a NUL byte
+    shows up in the first 8 KB, the binary test file(1) uses.
+    """
+    fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+    try:
+        # Small files, the common case, come in whole with one read() call
+        # instead of going through the text I/O layers
+        raw = os.read(fd, _SMALL_FILE_BYTES + 1)
+        nul = raw.find(b"\0", 0, _BINARY_SNIFF_BYTES)
+        if nul != -1:
+            raise UnicodeDecodeError(
+                "utf-8", raw, nul, nul + 1, "NUL byte, likely a binary file"
+            )
+        if len(raw) <= _SMALL_FILE_BYTES and not os.read(fd, 1):
+            content = raw.decode("utf-8", errors="ignore")
+            if "\r" in content:
+                # Universal newlines, as a text-mode read applies them
+                content = content.replace("\r\n", "\n").replace("\r", "\n")
+            return content[: limit + 1], len(content)
+    finally:
+        os.close(fd)
+
+    with open(path, encoding="utf-8", errors="ignore") as f:
+        content = f.read(limit + 1)
+        total_chars = len(content)
+        if total_chars > limit:
+            block = f.read(_COUNT_BLOCK_CHARS)
+            while block:
+                total_chars += len(block)
+                block = f.read(_COUNT_BLOCK_CHARS)
+    return content, total_chars
 
 
 def get_all_project_files_context(
@@ -206,69 +511,46 @@ def get_all_project_files_context(
     all_relative_files: List[str] = []
     file_contents_map: Dict[str, str] = {}
     current_total_chars: int = 0
-    all_items_in_project = sorted(
-        list(project_path.rglob("*")), key=lambda p: p.as_posix()
-    )
-
-    def _is_path_ignored(item_path: Path, root_path: Path) -> bool:
-        if (
-            item_path.name in COMMON_IGNORE_DIRS
-            or item_path.name in COMMON_IGNORE_FILES
-        ):
-            return True
-        for pattern in COMMON_IGNORE_DIRS:
-            if "*" in pattern and item_path.is_dir() and item_path.match(pattern):
-                return True
-        for pattern in COMMON_IGNORE_FILES:
-            if "*" in pattern and item_path.is_file() and item_path.match(pattern):
-                return True
-        try:
-            relative_path_to_root = item_path.relative_to(root_path)
-            for part in relative_path_to_root.parts[:-1]:
-                if part in COMMON_IGNORE_DIRS:
-                    return True
-        except ValueError:
-            return False
-        return False
+    project_files = sorted(_iter_project_files(str(project_path)), key=lambda f: f[0])
 
-    for item in all_items_in_project:
-        if _is_path_ignored(item, project_path):
-            continue
-        if item.is_file():
-            try:
-                relative_path_str = str(item.relative_to(project_path).as_posix())
-            except ValueError:
-                continue
+    # Reads run on a pool a window ahead of the file being added; each is
+    # capped to the budget left when it starts, which can only shrink
+    reads: Deque["Future[Tuple[str, int]]"] = deque()
+    with ThreadPoolExecutor(max_workers=_READ_WORKERS) as pool:
+        for position, (relative_path_str, _) in enumerate(project_files):
             all_relative_files.append(relative_path_str)
+            can_add_chars = max_total_chars - current_total_chars
+            if can_add_chars <= 0:
+                file_contents_map[relative_path_str] = (
+                    "... [CONTENT SKIPPED - TOTAL SIZE LIMIT REACHED PRIOR TO THIS FILE]"
+                )
+                continue
+
+            upcoming = position + len(reads)
+            while len(reads) < _READ_WINDOW and upcoming < len(project_files):
+                upcoming_path = project_files[upcoming][1].path
+                reads.append(pool.submit(_read_capped, upcoming_path, can_add_chars))
+                upcoming += 1
             try:
-                if current_total_chars < max_total_chars:
-                    content = item.read_text(encoding="utf-8", errors="ignore")
-                    chars_to_add = len(content)
-                    if chars_to_add + current_total_chars > max_total_chars:
-                        can_add_chars = max_total_chars - current_total_chars
-                        if can_add_chars <= 0:
-                            file_contents_map[relative_path_str] = (
-                                "... [CONTENT SKIPPED - TOTAL SIZE LIMIT REACHED]"
-                            )
-                            continue
-                        content = (
-                            content[:can_add_chars]
-                            + f"\n... [TRUNCATED - {chars_to_add - can_add_chars} of {chars_to_add} chars omitted]"
-                        )
-                        current_total_chars += can_add_chars
-                    else:
-                        current_total_chars += chars_to_add
-                    file_contents_map[relative_path_str] = content
-                else:
-                    file_contents_map[relative_path_str] = (
-                        "... [CONTENT SKIPPED - TOTAL SIZE LIMIT REACHED PRIOR TO THIS FILE]"
+                content, chars_to_add = reads.popleft().result()
+                if chars_to_add > can_add_chars:
+                    content = (
+                        content[:can_add_chars]
+                        + f"\n... [TRUNCATED - {chars_to_add - can_add_chars} of {chars_to_add} chars omitted]"
                     )
+                    current_total_chars += can_add_chars
+                else:
+                    current_total_chars += chars_to_add
+                file_contents_map[relative_path_str] = content
             except UnicodeDecodeError:
                 file_contents_map[relative_path_str] = (
                     "[Error: Could not decode file as UTF-8. Likely a binary file.]"
                 )
             except Exception as e:
                 file_contents_map[relative_path_str] = f"[Error reading file: {str(e)}]"
+        # Reads still in flight belong to files past the budget
+        for read in reads:
+            read.cancel()
     return {
         "file_paths": sorted(all_relative_files),
         "all_file_contents": file_contents_map,
@@ -283,6 +565,37 @@ def read_file_content(file_path_str: str) -> Optional[str]:
         return None
 
 
+def _known_project_root(file_path_str: str) -> Optional[str]:
+    """Project path of the innermost RAG project holding ``file_path_str``"""
+    for root_prefix, project_path in _known_project_roots:
+        if file_path_str.startswith(root_prefix):
+            return project_path
+    return None
+
+
+def _find_project_root(directory: Path) -> Optional[str]:
+    """Closest directory at or above ``directory`` holding a project marker
+
+    The answer is remembered for every directory passed on the way up, so
+    repeated writes into a project skip the marker stat() calls.
+    """
+    visited = []
+    project_root = None
+    for parent in (directory, *directory.parents):
+        key = str(parent)
+        if key in _project_roots:
+            project_root = _project_roots[key]
+            break
+        visited.append(key)
+        if any((parent / marker).exists() for marker in _PROJECT_MARKERS):
+            project_root = key
+            break
+
+    for key in visited:
+        _project_roots[key] = project_root
+    return project_root
+
+
 def write_file_content(file_path_str: str, content: str) -> bool:
     try:
         path = Path(file_path_str).resolve()
@@ -290,15 +603,14 @@ def write_file_content(file_path_str: str, content: str) -> bool:
         path.write_text(content, encoding="utf-8")
 
         # Invalidate RAG cache for the project when files are modified
-        project_path = None
-        for parent in path.parents:
-            if (
-                (parent / ".git").exists()
-                or (parent / "requirements.txt").exists()
-                or (parent / "package.json").exists()
-            ):
-                project_path = str(parent)
-                break
+        # Projects with a RAG system are matched by prefix, without stat()s;
+        # other files fall back to looking for a project marker
+        project_path = _known_project_root(str(path))
+        if path.name in _PROJECT_MARKERS:
+            # A new marker may move the root of directories already looked up
+            _project_roots.clear()
+        if project_path is None:
+            project_path = _find_project_root(path.parent)
 
         if project_path:
             invalidate_rag_cache(project_path)